@@ -0,0 +1,170 @@
+"""
+🍋 Fake market data server for offline benchmarks and load tests
+
+Speaks enough of the Tradier REST API (/v1/markets/history, /quotes,
+/timesales) for TradierProvider, with configurable latency and 429 /
+empty-response injection. Bars are synthetic but deterministic per symbol.
+"""
+
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def synthetic_bars(symbol, days=260, end=None):
+    """Deterministic random-walk daily bars for `symbol`, oldest first"""
+    rng = random.Random(zlib.crc32(symbol.encode()))
+    end = end or date.today()
+    bars = []
+    price = rng.uniform(5, 500)
+    day = end - timedelta(days=int(days * 7 / 5) + 7)
+    while day <= end:
+        if day.weekday() < 5:
+            open_ = price * (1 + rng.gauss(0, 0.01))
+            close = open_ * (1 + rng.gauss(0, 0.02))
+            high = max(open_, close) * (1 + abs(rng.gauss(0, 0.01)))
+            low = min(open_, close) * (1 - abs(rng.gauss(0, 0.01)))
+            bars.append({
+                'date': day.isoformat(),
+                'open': round(open_, 2),
+                'high': round(high, 2),
+                'low': round(low, 2),
+                'close': round(close, 2),
+                'volume': int(rng.uniform(2e5, 5e6))
+            })
+            price = close
+        day += timedelta(days=1)
+    return bars[-days:]
+
+
+class FakeMarketServer:
+    """
+    Threaded local HTTP server; `base_url` is what TRADIER_BASE_URL should be.
+    Counts every request by path, and every injected 429 / empty answer, so
+    callers can measure upstream load. Each request waits `latency` plus up
+    to `jitter` seconds.
+    """
+
+    def __init__(self, latency=0.05, error_rate=0.0, empty_rate=0.0, port=0, jitter=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.empty_rate = empty_rate
+        self.calls = {}
+        self.injected = {'429': 0, 'empty': 0}
+        self.symbols_requested = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self._httpd.server_address[1]}/v1'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls = {}
+            self.injected = {'429': 0, 'empty': 0}
+            self.symbols_requested = 0
+
+    def total_calls(self):
+        with self._lock:
+            return sum(self.calls.values())
+
+    def counts(self):
+        """Snapshot of upstream calls by path and injected faults"""
+        with self._lock:
+            return {'calls': dict(self.calls), 'injected': dict(self.injected), 'symbols': self.symbols_requested}
+
+    def _inject(self, kind):
+        with self._lock:
+            self.injected[kind] += 1
+
+    def _record(self, path, symbols):
+        with self._lock:
+            self.calls[path] = self.calls.get(path, 0) + 1
+            self.symbols_requested += symbols
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                path = url.path.replace('/v1', '', 1)
+                symbols = [s for s in (params.get('symbols') or params.get('symbol') or '').split(',') if s]
+                server._record(path, len(symbols))
+
+                if server.latency or server.jitter:
+                    time.sleep(server.latency + random.uniform(0, server.jitter))
+                if random.random() < server.error_rate:
+                    server._inject('429')
+                    return self._send(429, {'fault': 'Too Many Requests'})
+                empty = random.random() < server.empty_rate
+                if empty:
+                    server._inject('empty')
+
+                if path == '/markets/history':
+                    days = [] if empty else synthetic_bars(symbols[0])
+                    start = params.get('start')
+                    if start:
+                        days = [d for d in days if d['date'] >= start]
+                    return self._send(200, {'history': {'day': days} if days else None})
+
+                if path == '/markets/timesales':
+                    data = [] if empty else [
+                        {'time': f"{d['date']}T{hour:02d}:30:00", **{k: d[k] for k in ('open', 'high', 'low', 'close')},
+                         'volume': d['volume'] // 7}
+                        for d in synthetic_bars(symbols[0], days=10) for hour in range(9, 16)
+                    ]
+                    return self._send(200, {'series': {'data': data} if data else None})
+
+                if path == '/markets/quotes':
+                    quotes = []
+                    for symbol in ([] if empty else symbols):
+                        bars = synthetic_bars(symbol, days=30)
+                        quotes.append({
+                            'symbol': symbol,
+                            'description': f'{symbol} Inc',
+                            'last': bars[-1]['close'],
+                            'prevclose': bars[-2]['close'],
+                            'volume': bars[-1]['volume'],
+                            'average_volume': sum(b['volume'] for b in bars) // len(bars),
+                            'week_52_high': max(b['high'] for b in bars),
+                            'week_52_low': min(b['low'] for b in bars),
+                            'trade_date': int(datetime.now().timestamp() * 1000)
+                        })
+                    if not quotes:
+                        return self._send(200, {'quotes': {'unmatched_symbols': {'symbol': symbols}}})
+                    return self._send(200, {'quotes': {'quote': quotes[0] if len(quotes) == 1 else quotes}})
+
+                return self._send(404, {'fault': f'Unknown path {path}'})
+
+        return Handler
@@ -0,0 +1,84 @@
+"""
+🍋 Fetch executor benchmark: wall time vs. concurrency
+
+Runs TradierProvider.history for a synthetic watchlist against a local
+fake market server, once per worker count, and prints wall time and
+throughput. No network needed.
+
+    python benchmarks/fetch_concurrency.py --tickers 100 --latency 0.1
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_market import FakeMarketServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.1, help='Fake server latency per request (s)')
+    parser.add_argument('--workers', default='1,2,4,8,16,32')
+    parser.add_argument('--rate', type=float, default=1000.0, help='Token bucket rate (req/s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    server = FakeMarketServer(latency=args.latency, error_rate=args.error_rate).start()
+    os.environ.update({
+        'TRADIER_API_KEY': 'benchmark',
+        'TRADIER_BASE_URL': server.base_url,
+        'DATA_PROVIDER': 'tradier',
+        'SCHEDULER_ENABLED': '0',
+        'BAR_STORE_ENABLED': '0',
+        'SHARED_CACHE_ENABLED': '0',
+    })
+    import lemon_squeeze_webapp as webapp
+
+    tickers = [f'T{i:04d}' for i in range(args.tickers)]
+    provider = webapp.TradierProvider()
+    rows = []
+
+    print(f"\n🍋 {args.tickers} tickers, {args.latency * 1000:.0f}ms latency, {args.rate:g} req/s budget\n")
+    print(f"{'workers':>8} {'wall s':>8} {'req/s':>8} {'served':>7} {'calls':>6} {'backoffs':>8}")
+
+    for workers in [int(w) for w in args.workers.split(',')]:
+        webapp.fetch_executor = ThreadPoolExecutor(max_workers=workers)
+        webapp.rate_limits['tradier'] = webapp.TokenBucket('tradier', args.rate)
+        webapp.tradier_calls = webapp.CallWindow(10 ** 9)  # The 120/min cap would dominate every run
+        server.reset_counts()
+
+        started = time.perf_counter()
+        served = provider.history(tickers, '1d', '3mo')
+        wall = time.perf_counter() - started
+
+        calls = server.total_calls()
+        row = {
+            'workers': workers,
+            'wallSeconds': round(wall, 3),
+            'requestsPerSecond': round(calls / wall, 1),
+            'served': len(served),
+            'upstreamCalls': calls,
+            'backoffs': webapp.rate_limits['tradier'].backoffs
+        }
+        rows.append(row)
+        print(f"{workers:>8} {wall:>8.2f} {row['requestsPerSecond']:>8.1f} {len(served):>7} {calls:>6} {row['backoffs']:>8}")
+        webapp.fetch_executor.shutdown()
+
+    server.stop()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': rows}, f, indent=2)
+        print(f"\n💾 Saved {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+🍋 End-to-end load test: the Flask endpoints against a fake market backend
+
+Starts the fake Tradier server and the app (in-process, or under gunicorn
+with --gunicorn), then drives each endpoint in two phases:
+
+- cold:   every client sends its first request at once, before any scan
+          result exists, so this is the latency of a scan under a burst
+- steady: every client polls in a loop for --duration seconds
+
+For each phase it prints throughput, p50/p95/p99/max latency, failed
+requests and the upstream calls (plus injected 429s and empty answers) the
+fake server saw. Yahoo has no configurable endpoint, so the app runs with
+DATA_PROVIDER=tradier. No network needed.
+
+    python benchmarks/loadtest.py --concurrency 20 --duration 30 --endpoints scan,volemon-scan
+    python benchmarks/loadtest.py --gunicorn --workers 4 --threads 8 --error-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_market import FakeMarketServer
+
+# name: (method, path, JSON body)
+ENDPOINTS = {
+    'scan': ('POST', '/api/scan', {}),
+    'daily-plays': ('POST', '/api/daily-plays', {}),
+    'weekly-plays': ('POST', '/api/weekly-plays', {}),
+    'hourly-plays': ('POST', '/api/hourly-plays', {}),
+    'crypto-plays': ('POST', '/api/crypto-plays', {}),
+    'volemon-scan': ('POST', '/api/volemon-scan', {'min_volume_multiple': 2.0}),
+    'usuals-scan': ('POST', '/api/usuals-scan', {}),
+    'continuity-scan': ('POST', '/api/continuity-scan', {}),
+    'screen': ('POST', '/api/screen', {'where': 'volume_ratio > 1', 'sort': '-risk_score', 'limit': 20}),
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    rank = max(int(round(pct / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=2)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f'App did not come up at {url}')
+
+
+def start_app(args, env):
+    """Base URL of a running app plus a stop() callable"""
+    port = free_port()
+    if args.gunicorn:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-w', str(args.workers), '--threads', str(args.threads),
+             '-b', f'127.0.0.1:{port}', '--timeout', str(int(args.timeout)), 'lemon_squeeze_webapp:app'],
+            cwd=ROOT, env={**os.environ, **env}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        def stop():
+            process.terminate()
+            process.wait(timeout=30)
+    else:
+        os.environ.update(env)
+        os.chdir(ROOT)  # The squeeze list is read relative to the working directory
+        from werkzeug.serving import make_server, WSGIRequestHandler
+        import lemon_squeeze_webapp as webapp
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        server = make_server('127.0.0.1', port, webapp.app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        stop = server.shutdown
+    base_url = f'http://127.0.0.1:{port}'
+    wait_for(f'{base_url}/api/providers')
+    return base_url, stop
+
+
+def drive(base_url, endpoint, clients, duration, timeout):
+    """
+    Latencies (s) and failure count for `clients` threads hitting `endpoint`,
+    each sending one request (duration None) or looping for `duration` seconds
+    """
+    method, path, body = ENDPOINTS[endpoint]
+    latencies, failures = [], [0]
+    lock = threading.Lock()
+    start = threading.Barrier(clients)
+
+    def client():
+        session = requests.Session()
+        start.wait()
+        deadline = time.perf_counter() + (duration or 0)
+        while True:
+            began = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=timeout)
+                ok = response.status_code == 200 and response.json().get('success')
+            except (requests.RequestException, ValueError):
+                ok = False
+            elapsed = time.perf_counter() - began
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    failures[0] += 1
+            if duration is None or time.perf_counter() >= deadline:
+                break
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), failures[0], time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoints', default='scan,volemon-scan,usuals-scan,daily-plays,screen',
+                        help=f"Comma-separated, from: {', '.join(ENDPOINTS)}")
+    parser.add_argument('--concurrency', type=int, default=20, help='Simultaneous clients')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of steady polling per endpoint')
+    parser.add_argument('--latency', type=float, default=0.05, help='Fake server latency per request (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of upstream requests answered with 429')
+    parser.add_argument('--empty-rate', type=float, default=0.0, help='Fraction of upstream requests answered with no data')
+    parser.add_argument('--tradier-budget', type=int, default=100000,
+                        help='TRADIER_CALLS_PER_MINUTE for the app; the real 120 would dominate every run')
+    parser.add_argument('--gunicorn', action='store_true', help='Serve the app with gunicorn instead of in-process')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per worker')
+    parser.add_argument('--scheduler', action='store_true', help='Leave the background scheduler on')
+    parser.add_argument('--timeout', type=float, default=300, help='Per-request timeout (s)')
+    parser.add_argument('--verbose', action='store_true', help="Keep the in-process app's scan logging")
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(',') if e.strip()]
+    unknown = [e for e in endpoints if e not in ENDPOINTS]
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(unknown)}")
+
+    market = FakeMarketServer(latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, empty_rate=args.empty_rate).start()
+    state_dir = tempfile.mkdtemp(prefix='lemon-load-')
+    env = {
+        'TRADIER_API_KEY': 'benchmark',
+        'TRADIER_BASE_URL': market.base_url,
+        'DATA_PROVIDER': 'tradier',
+        'TRADIER_CALLS_PER_MINUTE': str(args.tradier_budget),
+        'SCHEDULER_ENABLED': '1' if args.scheduler else '0',
+        'BAR_STORE_DIR': os.path.join(state_dir, 'bar_store'),
+        'SHARED_CACHE_PATH': os.path.join(state_dir, 'shared_cache.db'),
+    }
+    out = sys.stdout
+    if not args.verbose:
+        sys.stdout = open(os.devnull, 'w')  # The in-process app logs every scanned ticker
+
+    def report(line):
+        print(line, file=out)
+
+    base_url, stop = start_app(args, env)
+    server_kind = f'gunicorn {args.workers}x{args.threads}' if args.gunicorn else 'in-process'
+
+    report(f"\n🍋 {args.concurrency} clients, {server_kind}, {args.latency * 1000:.0f}ms upstream latency, "
+           f"{args.error_rate:.0%} 429s, {args.empty_rate:.0%} empty\n")
+    report(f"{'endpoint':>16} {'phase':>6} {'reqs':>6} {'fail':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+           f"{'p99 ms':>9} {'max ms':>9} {'upstream':>9} {'429s':>5} {'empty':>5}")
+
+    rows = []
+    try:
+        for endpoint in endpoints:
+            for phase, duration in (('cold', None), ('steady', args.duration)):
+                before = market.counts()
+                latencies, failures, wall = drive(base_url, endpoint, args.concurrency, duration, args.timeout)
+                after = market.counts()
+                ms = {p: round(percentile(latencies, p) * 1000, 1) for p in (50, 95, 99)}
+                row = {
+                    'endpoint': endpoint,
+                    'phase': phase,
+                    'requests': len(latencies),
+                    'failures': failures,
+                    'wallSeconds': round(wall, 3),
+                    'requestsPerSecond': round(len(latencies) / wall, 1),
+                    'p50Ms': ms[50],
+                    'p95Ms': ms[95],
+                    'p99Ms': ms[99],
+                    'maxMs': round(latencies[-1] * 1000, 1),
+                    'upstreamCalls': sum(after['calls'].values()) - sum(before['calls'].values()),
+                    'upstreamByPath': {p: n - before['calls'].get(p, 0) for p, n in after['calls'].items()
+                                       if n != before['calls'].get(p, 0)},
+                    'injected429': after['injected']['429'] - before['injected']['429'],
+                    'injectedEmpty': after['injected']['empty'] - before['injected']['empty']
+                }
+                rows.append(row)
+                report(f"{endpoint:>16} {phase:>6} {row['requests']:>6} {failures:>5} {row['requestsPerSecond']:>8.1f} "
+                       f"{ms[50]:>9.1f} {ms[95]:>9.1f} {ms[99]:>9.1f} {row['maxMs']:>9.1f} "
+                       f"{row['upstreamCalls']:>9} {row['injected429']:>5} {row['injectedEmpty']:>5}")
+    finally:
+        stop()
+        market.stop()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': rows}, f, indent=2)
+        report(f"\n💾 Saved {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+🍋 Scanner hot-path micro-benchmarks on synthetic bars
+
+Generates deterministic random-walk OHLCV for each universe size and times
+every scanner stage on its own, so a change to one of them shows up as a
+number instead of a feeling:
+
+- patterns:      strat_matches (vectorized) vs. check_strat_31 per ticker
+- classify:      classify_timeframes over daily + weekly bars
+- resample:      resample_bars(frames, 'W') vs. frame.resample('W') per ticker
+- volume:        stack_bars + squeeze_metrics (volume ratios) and rolling_volume
+- scoring:       calculate_risk_scores vs. calculate_risk_score per ticker
+- serialize:     json.dumps of one squeeze-style result row per ticker
+
+Each stage reports the best of --repeat runs and the first run on its own.
+No network needed. Save with --json and pass an earlier file to --compare
+to see the change per stage.
+
+    python benchmarks/scanner_hot_paths.py --tickers 50,500,5000 --json after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+os.environ.update({
+    'SCHEDULER_ENABLED': '0',
+    'BAR_STORE_ENABLED': '0',
+    'SHARED_CACHE_ENABLED': '0',
+})
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import pandas as pd
+
+import lemon_squeeze_webapp as webapp
+
+
+def synthetic_frames(count, days, seed=7):
+    """{ticker: daily OHLCV DataFrame}, random walks sharing one NY-time index"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end='2024-06-28', periods=days, tz=webapp.MARKET_TZ, name='Date')
+    start = rng.uniform(5, 500, size=(count, 1))
+    close = start * np.cumprod(1 + rng.normal(0, 0.02, size=(count, days)), axis=1)
+    open_ = close * (1 + rng.normal(0, 0.01, size=(count, days)))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, size=(count, days))))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, size=(count, days))))
+    volume = rng.uniform(2e5, 5e6, size=(count, days)).round()
+    return {
+        f'T{i:05d}': pd.DataFrame(
+            {'Open': open_[i], 'High': high[i], 'Low': low[i], 'Close': close[i], 'Volume': volume[i]},
+            index=index
+        )
+        for i in range(count)
+    }
+
+
+def best_of(repeat, func):
+    """(fastest, first) wall time of `repeat` calls, in seconds"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times), times[0]
+
+
+def stages(frames, baselines):
+    """(stage name, callable) for every timed stage on `frames`"""
+    tickers = list(frames)
+    weekly = webapp.resample_bars(frames, 'W')
+    window = webapp.stack_bars(frames, tickers, length=webapp.VOLUME_BASELINE_WINDOW + 1, fields=('Close', 'Volume'))
+    metrics = webapp.squeeze_metrics(window['Close'], window['Volume'])
+    volume = webapp.stack_bars(frames, tickers, fields=('Volume',))['Volume']
+
+    rng = np.random.default_rng(11)
+    short_interest = rng.uniform(25, 50, len(tickers))
+    float_shares = rng.uniform(1e7, 1e9, len(tickers))
+    days_to_cover = rng.uniform(0, 15, len(tickers))
+
+    rows = [
+        {
+            'ticker': ticker,
+            'company': f'{ticker} Inc',
+            'shortInterest': float(short_interest[i]),
+            'currentPrice': float(metrics['current_price'][i]),
+            'dailyChange': float(metrics['daily_change'][i]),
+            'volume': int(metrics['current_volume'][i]),
+            'avgVolume': int(metrics['avg_volume'][i]),
+            'volumeRatio': float(metrics['volume_ratio'][i]),
+            'floatShares': int(float_shares[i]),
+            'daysToCover': float(days_to_cover[i]),
+            'riskScore': 50.0,
+            'pattern': webapp.strat_31_pattern_data(frames[ticker].tail(3))
+        }
+        for i, ticker in enumerate(tickers)
+    ]
+
+    def scores():
+        webapp.calculate_risk_scores(short_interest, metrics['daily_change'], metrics['volume_ratio'],
+                                     days_to_cover, float_shares)
+
+    def scores_loop():
+        for i in range(len(tickers)):
+            webapp.calculate_risk_score(short_interest[i], metrics['daily_change'][i], metrics['volume_ratio'][i],
+                                        days_to_cover[i], float_shares[i])
+
+    def volume_metrics():
+        w = webapp.stack_bars(frames, tickers, length=webapp.VOLUME_BASELINE_WINDOW + 1, fields=('Close', 'Volume'))
+        webapp.squeeze_metrics(w['Close'], w['Volume'])
+
+    timed = [
+        ('patterns', lambda: webapp.strat_matches(frames, '3-1')),
+        ('classify', lambda: webapp.classify_timeframes({'daily': frames, 'weekly': weekly}, tickers, ('daily', 'weekly'))),
+        ('resample', lambda: webapp.resample_bars(frames, 'W')),
+        ('volume', volume_metrics),
+        ('rolling_volume', lambda: webapp.rolling_volume(volume, webapp.VOLUME_WINDOWS)),
+        ('scoring', scores),
+        ('serialize', lambda: json.dumps({'success': True, 'results': rows})),
+    ]
+    if baselines:
+        timed += [
+            ('patterns_loop', lambda: [webapp.check_strat_31(frame) for frame in frames.values()]),
+            ('resample_loop', lambda: [frame.resample('W').agg(webapp.OHLCV_AGG) for frame in frames.values()]),
+            ('scoring_loop', scores_loop),
+        ]
+    return timed
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', default='50,500,5000', help='Comma-separated universe sizes')
+    parser.add_argument('--days', type=int, default=260, help='Daily bars per ticker')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-baselines', action='store_true', help='Skip the per-ticker loop baselines')
+    parser.add_argument('--json', help='Write results to this file')
+    parser.add_argument('--compare', help='Earlier --json file to compare against')
+    args = parser.parse_args()
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = {(r['stage'], r['tickers']): r['seconds'] for r in json.load(f)['results']}
+
+    print(f"\n🍋 Scanner hot paths, {args.days} bars per ticker, best of {args.repeat}\n")
+    print(f"{'stage':>15} {'tickers':>8} {'ms':>10} {'first ms':>10} {'us/ticker':>10}" + (f" {'vs before':>10}" if previous else ''))
+
+    rows = []
+    for count in [int(n) for n in args.tickers.split(',')]:
+        for stage, func in stages(synthetic_frames(count, args.days), not args.no_baselines):
+            seconds, first = best_of(args.repeat, func)
+            row = {
+                'stage': stage,
+                'tickers': count,
+                'seconds': round(seconds, 6),
+                'firstSeconds': round(first, 6),
+                'microsPerTicker': round(seconds / count * 1e6, 2)
+            }
+            rows.append(row)
+            line = f"{stage:>15} {count:>8} {seconds * 1000:>10.2f} {first * 1000:>10.2f} {row['microsPerTicker']:>10.2f}"
+            before = previous.get((stage, count))
+            if before:
+                line += f" {seconds / before:>9.2f}x"
+            print(line)
+        print()
+
+    if args.json:
+        meta = {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'meta': meta, 'results': rows}, f, indent=2)
+        print(f"💾 Saved {args.json}")
+
+
+if __name__ == '__main__':
+    main()
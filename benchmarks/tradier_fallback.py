@@ -0,0 +1,110 @@
+"""
+🍋 Tradier fallback benchmark: upstream calls per fallback ticker
+
+Sends N fallback tickers to Tradier against a local fake market server,
+three ways, and prints how many quote requests each cost:
+
+- bulk:       TradierProvider.info(tickers), as the fundamentals cache does
+- concurrent: get_tradier_quote(ticker) from N threads at once
+- budget:     N threads racing for the 120/min window, each sending one call
+
+With batching, N fallbacks cost about N/100 calls and the budget never
+lets more than 120 calls through. No network needed.
+
+    python benchmarks/tradier_fallback.py --tickers 500
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_market import FakeMarketServer
+
+
+def run_threads(count, target):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05, help='Fake server latency per request (s)')
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    server = FakeMarketServer(latency=args.latency).start()
+    os.environ.update({
+        'TRADIER_API_KEY': 'benchmark',
+        'TRADIER_BASE_URL': server.base_url,
+        'DATA_PROVIDER': 'tradier',
+        'SCHEDULER_ENABLED': '0',
+        'BAR_STORE_ENABLED': '0',
+        'SHARED_CACHE_ENABLED': '0',
+    })
+    import lemon_squeeze_webapp as webapp
+
+    webapp.rate_limits['tradier'] = webapp.TokenBucket('tradier', 1000.0)
+    tickers = [f'T{i:04d}' for i in range(args.tickers)]
+    rows = []
+
+    def measure(mode, func):
+        webapp.tradier_quotes = webapp.TradierQuotes()
+        webapp.tradier_calls = webapp.CallWindow(webapp.TRADIER_CALLS_PER_MINUTE)
+        server.reset_counts()
+        started = time.perf_counter()
+        served = func()
+        wall = time.perf_counter() - started
+        row = {
+            'mode': mode,
+            'tickers': args.tickers,
+            'served': served,
+            'upstreamCalls': server.total_calls(),
+            'wallSeconds': round(wall, 3)
+        }
+        rows.append(row)
+        print(f"{mode:>11} {args.tickers:>8} {served:>7} {row['upstreamCalls']:>6} {wall:>8.2f}")
+
+    def bulk():
+        return len(webapp.TradierProvider().info(tickers))
+
+    def concurrent():
+        quotes = {}
+        def target(i):
+            quotes[tickers[i]] = webapp.get_tradier_quote(tickers[i])
+        run_threads(len(tickers), target)
+        return sum(1 for quote in quotes.values() if quote)
+
+    def budget():
+        granted = []
+        def target(i):
+            if webapp.reserve_tradier_call():
+                granted.append(i)
+        run_threads(len(tickers), target)
+        return len(granted)
+
+    print(f"\n🍋 {args.tickers} fallback tickers, {args.latency * 1000:.0f}ms latency\n")
+    print(f"{'mode':>11} {'tickers':>8} {'served':>7} {'calls':>6} {'wall s':>8}")
+    measure('bulk', bulk)
+    measure('concurrent', concurrent)
+    measure('budget', budget)
+
+    server.stop()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': rows}, f, indent=2)
+        print(f"\n💾 Saved {args.json}")
+
+
+if __name__ == '__main__':
+    main()
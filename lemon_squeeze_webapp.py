@@ -1,7 +1,7 @@
 """
 🍋 LEMON SQUEEZE WEB APP v3.0 - OPTIMIZED & REDUCED 🍋
 Changes:
-- Short Squeeze: Top 30 only (from CSV)
+- Short Squeeze: Whole CSV, two-stage prefilter
 - Daily Plays: Keep full list (47 stocks)
 - Weekly/Hourly Plays: Daily list + Volemon list combined
 - Volemon: Keep full list (33 stocks)
@@ -11,73 +11,1397 @@ Changes:
 Total API calls reduced from 493-1,393 to ~200 per complete scan!
 """
 
-from flask import Flask, render_template, jsonify, request, send_from_directory, session
+from flask import Flask, render_template, jsonify, request, send_from_directory, session, Response, stream_with_context, g
 import yfinance as yf
-from datetime import datetime
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
 import time
 import os
 import json
+import ast
+import operator
 import hashlib
 import secrets
 import requests
-from collections import deque
+from requests.adapters import HTTPAdapter
+import threading
+import queue
+import sqlite3
+from contextlib import contextmanager
+from functools import wraps
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from zoneinfo import ZoneInfo
 
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(32)
+
+# ===== METRICS =====
+# Process-wide counters and latency histograms for the hot paths, served
+# at /metrics in Prometheus text format. Each gunicorn worker reports its own.
+
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_HELP = {
+    'lemon_upstream_request_seconds': ('histogram', 'Upstream request latency per ticker, by provider and outcome'),
+    'lemon_provider_tickers_total': ('counter', 'Tickers asked of each provider, by method and whether it served them'),
+    'lemon_provider_fallback_tickers_total': ('counter', 'Tickers served by a provider after an earlier one missed them'),
+    'lemon_rate_limit_wait_seconds_total': ('counter', 'Seconds spent waiting on a provider token bucket'),
+    'lemon_rate_limit_backoffs_total': ('counter', 'Times a provider rate was halved after a 429 or empty answer'),
+    'lemon_stage_seconds': ('histogram', 'Wall time of each scan stage'),
+    'lemon_stage_cpu_seconds_total': ('counter', 'CPU time of each scan stage, on the thread that ran it'),
+    'lemon_scan_seconds': ('histogram', 'Wall time of a full scan, by job'),
+    'lemon_tradier_fallback_total': ('counter', 'Tradier quote fallbacks for tickers no provider had bars for, by outcome'),
+    'lemon_ticker_lookups_total': ('counter', 'Single-ticker lookups that could fall back to a Tradier quote'),
+    'lemon_cache_hits_total': ('counter', 'Cache hits, by cache'),
+    'lemon_cache_misses_total': ('counter', 'Cache misses, by cache'),
+    'lemon_cache_hit_ratio': ('gauge', 'Hits over lookups since start, by cache'),
+    'lemon_cache_entries': ('gauge', 'Entries held, by cache'),
+    'lemon_rate_limit_rate': ('gauge', 'Current requests per second allowed, by provider'),
+    'lemon_tradier_budget_used': ('gauge', 'Tradier calls made in the last minute'),
+}
+
+class Metrics:
+    """Counters and histograms keyed by (name, labels); collectors add gauges at scrape time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., count, sum]
+        self._collectors = []
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1.0, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * len(METRIC_BUCKETS) + [0, 0.0]
+            for i, bound in enumerate(METRIC_BUCKETS):
+                if value <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += value
+
+    def collector(self, func):
+        """Register func() -> [(name, labels, value)], called on every scrape"""
+        self._collectors.append(func)
+        return func
+
+    def render(self):
+        """Everything in Prometheus text exposition format"""
+        def fmt(labels):
+            return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}' if labels else ''
+
+        samples = {}  # name -> [line, ...]
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                samples.setdefault(name, []).append(f'{name}{fmt(labels)} {value:g}')
+            for (name, labels), histogram in self._histograms.items():
+                lines = samples.setdefault(name, [])
+                for bound, count in zip(METRIC_BUCKETS, histogram):
+                    lines.append(f'{name}_bucket{fmt(labels + (("le", f"{bound:g}"),))} {count}')
+                lines.append(f'{name}_bucket{fmt(labels + (("le", "+Inf"),))} {histogram[-2]}')
+                lines.append(f'{name}_count{fmt(labels)} {histogram[-2]}')
+                lines.append(f'{name}_sum{fmt(labels)} {histogram[-1]:g}')
+        for collect in self._collectors:
+            try:
+                for name, labels, value in collect():
+                    samples.setdefault(name, []).append(f'{name}{fmt(self._key(name, labels)[1])} {value:g}')
+            except Exception as e:
+                print(f"⚠️  Metrics collector failed: {e}")
+
+        out = []
+        for name in sorted(samples):
+            kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+            out.append(f'# HELP {name} {help_text}')
+            out.append(f'# TYPE {name} {kind}')
+            out.extend(samples[name])
+        return '\n'.join(out) + '\n'
+
+metrics = Metrics()
+
+# Per-thread stage breakdown, filled while a scan or a ?timing=1 request runs
+stage_timings = threading.local()
+
+@contextmanager
+def timed_stage(stage):
+    """Record wall and CPU time of a block under `stage`"""
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+        metrics.observe('lemon_stage_seconds', wall, stage=stage)
+        metrics.inc('lemon_stage_cpu_seconds_total', cpu, stage=stage)
+        breakdown = getattr(stage_timings, 'breakdown', None)
+        if breakdown is not None:
+            entry = breakdown.setdefault(stage, {'seconds': 0.0, 'cpuSeconds': 0.0, 'calls': 0})
+            entry['seconds'] += wall
+            entry['cpuSeconds'] += cpu
+            entry['calls'] += 1
+
+def timed(stage):
+    """Decorator form of timed_stage"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@contextmanager
+def collect_timings():
+    """Gather this thread's stage timings into the yielded dict"""
+    previous = getattr(stage_timings, 'breakdown', None)
+    stage_timings.breakdown = breakdown = {}
+    try:
+        yield breakdown
+    finally:
+        stage_timings.breakdown = previous
+
+def rounded_timings(breakdown):
+    return {
+        stage: {'seconds': round(t['seconds'], 4), 'cpuSeconds': round(t['cpuSeconds'], 4), 'calls': t['calls']}
+        for stage, t in breakdown.items()
+    }
 
 # ===== TRADIER API (OPTIONAL FALLBACK) =====
 TRADIER_API_KEY = os.environ.get('TRADIER_API_KEY', '')
-TRADIER_BASE_URL = 'https://api.tradier.com/v1'
-tradier_call_times = deque()
+TRADIER_BASE_URL = os.environ.get('TRADIER_BASE_URL', 'https://api.tradier.com/v1')
+TRADIER_CALLS_PER_MINUTE = int(os.environ.get('TRADIER_CALLS_PER_MINUTE', 120))  # Raise to match a higher account tier
+TRADIER_SYMBOLS_PER_CALL = 100  # Symbols per quotes request, keeps the URL well under limits
+TRADIER_QUOTE_TTL = 15  # Seconds a fallback quote is reused
+TRADIER_BATCH_WINDOW = 0.05  # Seconds single-quote callers wait for company in one request
 
-def can_call_tradier():
-    """Rate limiter: 120 calls per minute"""
-    if not TRADIER_API_KEY:
-        return False
-    now = time.time()
-    while tradier_call_times and tradier_call_times[0] < now - 60:
-        tradier_call_times.popleft()
-    if len(tradier_call_times) >= 120:
-        return False
-    return True
+class CallWindow:
+    """
+    Thread-safe sliding-window budget: at most `limit` calls per `window` seconds
+    A call is counted when it is reserved, before it is sent, so concurrent
+    threads can never overshoot and failed or 429'd attempts still count.
+    """
+
+    def __init__(self, limit, window=60, name=None):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.calls = deque()
+        self.refused = 0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Claim a call slot; False when the window is full"""
+        if self.name and shared_cache is not None:
+            # Budget shared with the other worker processes
+            if shared_cache.reserve_call(self.name, self.limit, self.window):
+                return True
+            with self._lock:
+                self.refused += 1
+            return False
+        with self._lock:
+            now = time.monotonic()
+            while self.calls and self.calls[0] <= now - self.window:
+                self.calls.popleft()
+            if len(self.calls) >= self.limit:
+                self.refused += 1
+                return False
+            self.calls.append(now)
+            return True
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            used = sum(1 for t in self.calls if t > now - self.window)
+            return {
+                'limit': self.limit,
+                'used': used,
+                'refused': self.refused,
+                'shared': bool(self.name and shared_cache is not None)
+            }
+
+tradier_calls = CallWindow(TRADIER_CALLS_PER_MINUTE, name='tradier')
+
+def reserve_tradier_call():
+    """Claim one of the 120 calls per minute; False without an API key or budget"""
+    return bool(TRADIER_API_KEY) and tradier_calls.reserve()
+
+class TradierQuotes:
+    """
+    Batched Tradier quotes
+    Every pending ticker goes out in comma-separated requests of up to
+    TRADIER_SYMBOLS_PER_CALL symbols; concurrent single-ticker callers are
+    coalesced into one request, and answers are reused for TRADIER_QUOTE_TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache = {}  # ticker -> (fetched_at, quote)
+        self._pending = None  # batch collecting single-ticker callers
+        self.requests = 0
+        self.symbols = 0
+
+    def _request(self, symbols):
+        if not reserve_tradier_call():
+            return {}
+        rate_limits['tradier'].acquire()
+        with self._lock:
+            self.requests += 1
+            self.symbols += len(symbols)
+        try:
+            response = http_session.get(
+                f'{TRADIER_BASE_URL}/markets/quotes',
+                params={'symbols': ','.join(symbols)},
+                headers={'Authorization': f'Bearer {TRADIER_API_KEY}', 'Accept': 'application/json'},
+                timeout=5
+            )
+        except Exception as e:
+            print(f"❌ Tradier quotes: {e}")
+            return {}
+        if response.status_code == 429:
+            rate_limits['tradier'].penalize()
+            return {}
+        if response.status_code != 200:
+            return {}
+        rate_limits['tradier'].reward()
+
+        quotes = ((response.json() or {}).get('quotes') or {}).get('quote') or []
+        if isinstance(quotes, dict):
+            quotes = [quotes]
+        return {q['symbol']: q for q in quotes if isinstance(q, dict) and q.get('symbol') and q.get('last')}
+
+    def get_many(self, tickers):
+        """{ticker: quote} for every ticker Tradier could quote"""
+        now = time.time()
+        results, missing = {}, []
+        with self._lock:
+            for ticker in dict.fromkeys(tickers):
+                cached = self._cache.get(ticker)
+                if cached and now - cached[0] < TRADIER_QUOTE_TTL:
+                    results[ticker] = cached[1]
+                else:
+                    missing.append(ticker)
+
+        for start in range(0, len(missing), TRADIER_SYMBOLS_PER_CALL):
+            quotes = self._request(missing[start:start + TRADIER_SYMBOLS_PER_CALL])
+            with self._lock:
+                for ticker, quote in quotes.items():
+                    self._cache[ticker] = (time.time(), quote)
+            results.update(quotes)
+        return results
+
+    def get(self, ticker):
+        """One quote, sent together with any other ticker requested meanwhile"""
+        with self._lock:
+            cached = self._cache.get(ticker)
+            if cached and time.time() - cached[0] < TRADIER_QUOTE_TTL:
+                return cached[1]
+            batch = self._pending
+            leader = batch is None
+            if leader:
+                batch = self._pending = {'tickers': [], 'done': threading.Event(), 'quotes': {}}
+            batch['tickers'].append(ticker)
+
+        if leader:
+            time.sleep(TRADIER_BATCH_WINDOW)
+            with self._lock:
+                self._pending = None
+            try:
+                batch['quotes'] = self.get_many(batch['tickers'])
+            finally:
+                batch['done'].set()
+        else:
+            batch['done'].wait()
+        return batch['quotes'].get(ticker)
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self.requests, 'symbols': self.symbols, 'cached': len(self._cache)}
+
+tradier_quotes = TradierQuotes()
 
 def get_tradier_quote(ticker):
     """Fallback data source if Yahoo fails"""
-    if not can_call_tradier():
+    if not TRADIER_API_KEY:
         return None
+    return tradier_quotes.get(ticker)
+
+# ===== SHARED CACHE =====
+# One SQLite file (WAL mode) shared by every worker process on the box:
+# latest scan results, leases so only one worker runs each scan, and the
+# upstream rate budgets. Bars are already shared through the on-disk bar store.
+
+SHARED_CACHE_ENABLED = os.environ.get('SHARED_CACHE_ENABLED', '1') == '1'
+SHARED_CACHE_PATH = os.environ.get(
+    'SHARED_CACHE_PATH', os.path.join(os.environ.get('BAR_STORE_DIR', 'bar_store'), 'shared_cache.db')
+)
+
+SHARED_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scan_results (key TEXT PRIMARY KEY, computed_at REAL, results TEXT);
+CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT, expires_at REAL);
+CREATE TABLE IF NOT EXISTS token_buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL);
+CREATE TABLE IF NOT EXISTS calls (name TEXT, at REAL);
+CREATE INDEX IF NOT EXISTS calls_name_at ON calls (name, at);
+"""
+
+class SharedCache:
+    """Cross-process state in one SQLite file; one connection per thread and process"""
+
+    def __init__(self, path):
+        self.path = path
+        self.reads = 0
+        self.hits = 0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        db = sqlite3.connect(path, timeout=10, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.executescript(SHARED_CACHE_SCHEMA)
+        db.close()
+
+    @property
+    def owner(self):
+        """Lease owner id: this process"""
+        return str(os.getpid())
+
+    def _db(self):
+        # Connections must not cross a fork, so they are keyed by pid too
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._local.db.execute('PRAGMA synchronous=NORMAL')
+            self._local.pid = os.getpid()
+        return self._local.db
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the lock up front, so read-modify-write is atomic"""
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    # Scan results
+
+    def get_scan(self, key, newer_than=None):
+        """Stored result for `key`, or None; with `newer_than`, only a result computed after it"""
+        row = self._db().execute(
+            'SELECT computed_at, results FROM scan_results WHERE key = ? AND computed_at > ?',
+            (json.dumps(key), newer_than or 0)
+        ).fetchone()
+        self.reads += 1
+        if row is None:
+            return None
+        self.hits += 1
+        return {'results': json.loads(row[1]), 'computed_at': row[0]}
+
+    def put_scan(self, key, entry):
+        self._db().execute(
+            'INSERT OR REPLACE INTO scan_results (key, computed_at, results) VALUES (?, ?, ?)',
+            (json.dumps(key), entry['computed_at'], json.dumps(entry['results']))
+        )
+
+    # Leases
+
+    def try_lease(self, name, ttl):
+        """Take or renew `name` for `ttl` seconds; False while another process holds it"""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute('SELECT owner, expires_at FROM leases WHERE name = ?', (name,)).fetchone()
+            if row and row[0] != self.owner and row[1] > now:
+                return False
+            db.execute(
+                'INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)',
+                (name, self.owner, now + ttl)
+            )
+            return True
+
+    def release(self, name):
+        self._db().execute('DELETE FROM leases WHERE name = ? AND owner = ?', (name, self.owner))
+
+    # Rate budgets
+
+    def take_token(self, name, rate, burst):
+        """Token bucket shared by all processes; returns 0 when a token was taken, else seconds to wait"""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute('SELECT tokens, updated FROM token_buckets WHERE name = ?', (name,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            delay = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                delay = (1 - tokens) / rate
+            db.execute(
+                'INSERT OR REPLACE INTO token_buckets (name, tokens, updated) VALUES (?, ?, ?)',
+                (name, tokens, now)
+            )
+            return delay
+
+    def drain_tokens(self, name):
+        self._db().execute(
+            'INSERT OR REPLACE INTO token_buckets (name, tokens, updated) VALUES (?, 0, ?)', (name, time.time())
+        )
+
+    def reserve_call(self, name, limit, window):
+        """Sliding-window call budget shared by all processes"""
+        now = time.time()
+        with self._transaction() as db:
+            db.execute('DELETE FROM calls WHERE name = ? AND at <= ?', (name, now - window))
+            used = db.execute('SELECT COUNT(*) FROM calls WHERE name = ?', (name,)).fetchone()[0]
+            if used >= limit:
+                return False
+            db.execute('INSERT INTO calls (name, at) VALUES (?, ?)', (name, now))
+            return True
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'scanReads': self.reads,
+            'scanHits': self.hits,
+            'scans': self._db().execute('SELECT COUNT(*) FROM scan_results').fetchone()[0]
+        }
+
+shared_cache = None
+if SHARED_CACHE_ENABLED:
     try:
-        response = requests.get(
-            f'{TRADIER_BASE_URL}/markets/quotes',
-            params={'symbols': ticker},
+        shared_cache = SharedCache(SHARED_CACHE_PATH)
+    except Exception as e:
+        print(f"⚠️  Shared cache disabled ({SHARED_CACHE_PATH}): {e}")
+
+# ===== FETCH EXECUTOR =====
+# Every upstream request runs on one bounded thread pool and waits on its
+# provider's token bucket, so parallel scans share one rate budget instead
+# of each sleeping blindly.
+
+FETCH_WORKERS = int(os.environ.get('FETCH_WORKERS', 8))
+YAHOO_REQUESTS_PER_SECOND = float(os.environ.get('YAHOO_REQUESTS_PER_SECOND', 4))
+TRADIER_REQUESTS_PER_SECOND = TRADIER_CALLS_PER_MINUTE / 60
+FETCH_RETRIES = 1
+EMPTY_BACKOFF_STREAK = 5  # Empty answers in a row, from different calls, that count as throttling
+
+class RateLimitError(Exception):
+    """Upstream answered 429 / Too Many Requests"""
+
+def is_rate_limit_error(error):
+    message = str(error).lower()
+    return isinstance(error, RateLimitError) or '429' in message or 'too many' in message
+
+class TokenBucket:
+    """
+    Process-wide request budget for one provider
+    Halves its rate on 429s or a streak of empty answers and creeps back up
+    to the configured rate on success.
+    """
+
+    def __init__(self, name, rate, burst=None):
+        self.name = name
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst or max(rate, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.waited = 0.0  # Total seconds callers spent waiting
+        self.backoffs = 0
+        self.empty_streak = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent; returns seconds waited"""
+        waited = 0.0
+        while True:
+            if shared_cache is not None:
+                # Tokens live in the shared cache so all workers draw from one budget
+                delay = shared_cache.take_token(self.name, self.rate, self.burst)
+                if delay <= 0:
+                    with self._lock:
+                        self.waited += waited
+                    if waited:
+                        metrics.inc('lemon_rate_limit_wait_seconds_total', waited, provider=self.name)
+                    return waited
+                time.sleep(delay)
+                waited += delay
+                continue
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.waited += waited
+                    if waited:
+                        metrics.inc('lemon_rate_limit_wait_seconds_total', waited, provider=self.name)
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self):
+        with self._lock:
+            self.rate = max(self.rate / 2, self.base_rate / 16)
+            self.tokens = 0
+            self.backoffs += 1
+        metrics.inc('lemon_rate_limit_backoffs_total', provider=self.name)
+        if shared_cache is not None:
+            shared_cache.drain_tokens(self.name)
+        print(f"⚠️  {self.name}: backing off to {self.rate:.2f} req/s")
+
+    def note_empty(self):
+        """Count an empty answer; True once enough calls in a row came back empty to look like throttling"""
+        with self._lock:
+            self.empty_streak += 1
+            if self.empty_streak < EMPTY_BACKOFF_STREAK:
+                return False
+            self.empty_streak = 0
+            return True
+
+    def reward(self):
+        with self._lock:
+            self.empty_streak = 0
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rate': round(self.rate, 3),
+                'baseRate': self.base_rate,
+                'waitedSeconds': round(self.waited, 2),
+                'backoffs': self.backoffs
+            }
+
+fetch_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='fetch')
+
+# One keep-alive connection pool for every upstream host, big enough that
+# no fetch worker ever waits for (or opens) a connection of its own
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_WORKERS))
+http_session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_WORKERS))
+rate_limits = {
+    'yahoo': TokenBucket('yahoo', YAHOO_REQUESTS_PER_SECOND),
+    'tradier': TokenBucket('tradier', TRADIER_REQUESTS_PER_SECOND),
+}
+
+def limited_call(bucket, func):
+    """
+    Call `func` within the bucket's budget, backing off and retrying on 429s
+    A single empty answer is usually a delisted or bad ticker and is returned as is;
+    only a streak of them across different calls backs the provider off.
+    """
+    for attempt in range(FETCH_RETRIES + 1):
+        bucket.acquire()
+        started = time.perf_counter()
+        try:
+            result = func()
+        except Exception as e:
+            outcome = 'rate_limited' if is_rate_limit_error(e) else 'error'
+            metrics.observe('lemon_upstream_request_seconds', time.perf_counter() - started,
+                            provider=bucket.name, outcome=outcome)
+            if outcome == 'rate_limited' and attempt < FETCH_RETRIES:
+                bucket.penalize()
+                continue
+            raise
+        empty = result is None or len(result) == 0
+        metrics.observe('lemon_upstream_request_seconds', time.perf_counter() - started,
+                        provider=bucket.name, outcome='empty' if empty else 'ok')
+        if empty:
+            # Retries of the same call don't extend the streak
+            if attempt == 0 and bucket.note_empty() and attempt < FETCH_RETRIES:
+                bucket.penalize()
+                continue
+            return result
+        bucket.reward()
+        return result
+    return result
+
+def run_fetch_jobs(jobs):
+    """
+    Run {key: callable} on the shared fetch executor
+    Returns {key: result} for jobs that succeeded with a non-empty result.
+    Must not be called from inside a fetch job, or the pool can deadlock.
+    """
+    futures = {fetch_executor.submit(job): key for key, job in jobs.items()}
+    results = {}
+    for future in as_completed(futures):
+        key = futures[future]
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"❌ {key}: {e}")
+            continue
+        if result is not None and len(result) > 0:
+            results[key] = result
+    return results
+
+# ===== MARKET DATA PROVIDERS =====
+# Every scanner gets bars and fundamentals through `market_data`, which
+# routes to Yahoo, Tradier or recorded replay fixtures.
+
+DATA_PROVIDER = os.environ.get('DATA_PROVIDER', 'auto')  # auto, yahoo, tradier, replay
+REPLAY_DATA_DIR = os.environ.get('REPLAY_DATA_DIR', 'replay_data')
+MARKET_TZ = ZoneInfo('America/New_York')
+
+def trim_to_period(frame, period):
+    """Keep only the bars a Yahoo-style period ('5d', '3mo', '1y') would return"""
+    if frame.empty or period == 'max':
+        return frame
+    count, unit = int(period.rstrip('dmoy') or 1), period.lstrip('0123456789')
+    if unit == 'd':
+        # Trading days, not calendar days
+        days = frame.index.normalize().unique()
+        return frame[frame.index.normalize() >= days[max(len(days) - count, 0)]]
+    if unit == 'mo':
+        cutoff = frame.index[-1] - pd.DateOffset(months=count)
+    elif unit == 'y':
+        cutoff = frame.index[-1] - pd.DateOffset(years=count)
+    else:
+        return frame
+    return frame[frame.index > cutoff]
+
+class DataProvider:
+    """
+    Market data source interface
+    history() returns {ticker: OHLCV DataFrame}, info() returns {ticker: dict};
+    tickers the provider couldn't serve are simply left out. Passing `start`
+    (a 'YYYY-MM-DD' date) fetches everything since then instead of `period`.
+    """
+    name = 'base'
+
+    def history(self, tickers, interval='1d', period='1mo', start=None):
+        raise NotImplementedError
+
+    def info(self, tickers):
+        raise NotImplementedError
+
+class YahooProvider(DataProvider):
+    """
+    yfinance, one chart request per ticker on the fetch executor
+    (yf.download keeps module-global state, so concurrent scans can't share it)
+    """
+    name = 'yahoo'
+
+    def history(self, tickers, interval='1d', period='1mo', start=None):
+        span = {'start': start} if start else {'period': period}
+        bucket = rate_limits['yahoo']
+
+        def job(ticker):
+            return lambda: limited_call(bucket, lambda: yf.Ticker(ticker, session=http_session).history(interval=interval, **span))
+
+        return run_fetch_jobs({ticker: job(ticker) for ticker in tickers})
+
+    def info(self, tickers):
+        bucket = rate_limits['yahoo']
+
+        def job(ticker):
+            return lambda: limited_call(bucket, lambda: yf.Ticker(ticker, session=http_session).info)
+
+        return run_fetch_jobs({ticker: job(ticker) for ticker in tickers})
+
+class TradierProvider(DataProvider):
+    """Tradier REST API, limited to 120 calls per minute"""
+    name = 'tradier'
+    HISTORY_INTERVALS = {'1d': 'daily', '1wk': 'weekly', '1mo': 'monthly'}
+    TIMESALES_INTERVALS = {'1m': '1min', '5m': '5min', '15m': '15min', '1h': '15min', '60m': '15min'}
+    PERIOD_DAYS = {'1d': 1, '5d': 7, '1mo': 31, '3mo': 92, '6mo': 183, '1y': 366, '2y': 731, '5y': 1827}
+
+    def _get(self, path, params):
+        if not reserve_tradier_call():
+            return None
+        response = http_session.get(
+            f'{TRADIER_BASE_URL}{path}',
+            params=params,
             headers={'Authorization': f'Bearer {TRADIER_API_KEY}', 'Accept': 'application/json'},
             timeout=5
         )
-        tradier_call_times.append(time.time())
-        if response.status_code == 200:
-            data = response.json()
-            if 'quotes' in data and 'quote' in data['quotes']:
-                quote = data['quotes']['quote']
-                if isinstance(quote, dict) and quote.get('last'):
-                    return quote
-    except:
-        pass
-    return None
+        if response.status_code == 429:
+            raise RateLimitError(f'Tradier 429 on {path}')
+        if response.status_code != 200:
+            return None
+        return response.json()
+
+    def _history_one(self, ticker, interval, period, start=None):
+        trim = start is None
+        if start is None:
+            days = self.PERIOD_DAYS.get(period, 92)
+            start = (datetime.now(MARKET_TZ) - timedelta(days=days)).strftime('%Y-%m-%d')
+
+        if interval in self.HISTORY_INTERVALS:
+            data = self._get('/markets/history', {
+                'symbol': ticker, 'interval': self.HISTORY_INTERVALS[interval], 'start': start
+            })
+            rows = ((data or {}).get('history') or {}).get('day')
+            time_key = 'date'
+        elif interval in self.TIMESALES_INTERVALS:
+            data = self._get('/markets/timesales', {
+                'symbol': ticker, 'interval': self.TIMESALES_INTERVALS[interval],
+                'start': f'{start} 09:30', 'session_filter': 'open'
+            })
+            rows = ((data or {}).get('series') or {}).get('data')
+            time_key = 'time'
+        else:
+            return None
+
+        if not rows:
+            return None
+        if isinstance(rows, dict):
+            rows = [rows]
+
+        frame = pd.DataFrame(rows)
+        frame.index = pd.DatetimeIndex(pd.to_datetime(frame[time_key])).tz_localize(MARKET_TZ)
+        frame = frame.rename(columns={
+            'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'
+        })[['Open', 'High', 'Low', 'Close', 'Volume']].astype(float)
+
+        if interval in ('1h', '60m'):
+            frame = frame.resample('1h', origin='start_day', offset='30min').agg({
+                'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
+            }).dropna()
+        return trim_to_period(frame, period) if trim else frame
+
+    def history(self, tickers, interval='1d', period='1mo', start=None):
+        bucket = rate_limits['tradier']
+
+        def job(ticker):
+            return lambda: limited_call(bucket, lambda: self._history_one(ticker, interval, period, start))
+
+        return run_fetch_jobs({ticker: job(ticker) for ticker in tickers})
+
+    def info(self, tickers):
+        quotes = tradier_quotes.get_many(tickers)
+        results = {}
+        for ticker, quote in quotes.items():
+            if quote:
+                results[ticker] = {
+                    'symbol': ticker,
+                    'shortName': ticker,
+                    'longName': quote.get('description') or ticker,
+                    'fiftyTwoWeekHigh': quote.get('week_52_high'),
+                    'fiftyTwoWeekLow': quote.get('week_52_low'),
+                    'averageVolume': quote.get('average_volume')
+                }
+        return results
+
+class ReplayProvider(DataProvider):
+    """
+    Recorded bars for offline load tests and benchmarks
+    Layout: <root>/<interval>/<TICKER>.csv (or .parquet) plus <root>/info.json
+    """
+    name = 'replay'
+
+    def __init__(self, root):
+        self.root = root
+        self._frames = {}
+        self._info = None
+        self._lock = threading.Lock()
+
+    def _load(self, ticker, interval):
+        key = (ticker, interval)
+        with self._lock:
+            if key in self._frames:
+                return self._frames[key]
+        frame = None
+        base = os.path.join(self.root, interval, ticker)
+        if os.path.exists(base + '.parquet'):
+            frame = pd.read_parquet(base + '.parquet')
+        elif os.path.exists(base + '.csv'):
+            frame = pd.read_csv(base + '.csv', index_col=0)
+        if frame is not None:
+            index = pd.to_datetime(frame.index)
+            if not isinstance(index, pd.DatetimeIndex):
+                # Mixed UTC offsets across a DST change
+                index = pd.to_datetime(frame.index, utc=True)
+            if index.tz is None:
+                index = index.tz_localize(MARKET_TZ)
+            frame.index = index.tz_convert(MARKET_TZ)
+            frame = frame.sort_index()
+        with self._lock:
+            self._frames[key] = frame
+        return frame
+
+    def history(self, tickers, interval='1d', period='1mo', start=None):
+        results = {}
+        for ticker in tickers:
+            frame = self._load(ticker, interval)
+            if frame is None:
+                continue
+            if start:
+                frame = frame[frame.index >= pd.Timestamp(start, tz=MARKET_TZ)]
+            else:
+                frame = trim_to_period(frame, period)
+            if len(frame) > 0:
+                results[ticker] = frame
+        return results
+
+    def info(self, tickers):
+        if self._info is None:
+            path = os.path.join(self.root, 'info.json')
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    self._info = json.load(f)
+            else:
+                self._info = {}
+        return {t: self._info[t] for t in tickers if t in self._info}
+
+def record_replay_fixtures(root, tickers, interval='1d', period='3mo'):
+    """Snapshot live data from `market_data` into a ReplayProvider directory"""
+    os.makedirs(os.path.join(root, interval), exist_ok=True)
+    frames = market_data.history(tickers, interval, period)
+    for ticker, frame in frames.items():
+        frame.to_csv(os.path.join(root, interval, f'{ticker}.csv'))
+
+    info_path = os.path.join(root, 'info.json')
+    recorded = {}
+    if os.path.exists(info_path):
+        with open(info_path, 'r') as f:
+            recorded = json.load(f)
+    recorded.update(market_data.info(tickers))
+    with open(info_path, 'w') as f:
+        json.dump(recorded, f, default=str)
+    return len(frames)
+
+class ProviderRouter:
+    """
+    Sends each request to the fastest healthy provider and passes any
+    tickers it couldn't serve down the chain. Providers that keep failing
+    sit out a cooldown.
+    """
+    FAILURES_BEFORE_COOLDOWN = 3
+    COOLDOWN_SECONDS = 60
+
+    def __init__(self, providers):
+        self.providers = providers
+        self._lock = threading.Lock()
+        self.health = {
+            p.name: {'latency': None, 'calls': 0, 'errors': 0, 'failures': 0, 'cooldownUntil': 0}
+            for p in providers
+        }
+
+    def _ranked(self, by_latency):
+        now = time.time()
+        with self._lock:
+            healthy = [p for p in self.providers if self.health[p.name]['cooldownUntil'] <= now]
+            if not healthy:
+                # Everyone is cooling down; try them all rather than return nothing
+                healthy = list(self.providers)
+            if by_latency:
+                # Tried providers fastest first; untried ones follow in their configured order
+                healthy.sort(key=lambda p: (self.health[p.name]['latency'] is None, self.health[p.name]['latency'] or 0.0))
+        return healthy
+
+    def _record(self, provider, elapsed, ok):
+        with self._lock:
+            h = self.health[provider.name]
+            h['calls'] += 1
+            h['latency'] = elapsed if h['latency'] is None else 0.8 * h['latency'] + 0.2 * elapsed
+            if ok:
+                h['failures'] = 0
+            else:
+                h['errors'] += 1
+                h['failures'] += 1
+                if h['failures'] >= self.FAILURES_BEFORE_COOLDOWN:
+                    h['cooldownUntil'] = time.time() + self.COOLDOWN_SECONDS
+                    print(f"⚠️  {provider.name}: cooling down for {self.COOLDOWN_SECONDS}s")
+
+    def _call(self, method, tickers, args, by_latency):
+        results = {}
+        remaining = list(tickers)
+        for position, provider in enumerate(self._ranked(by_latency)):
+            if not remaining:
+                break
+            started = time.time()
+            try:
+                served = getattr(provider, method)(remaining, *args)
+            except Exception as e:
+                print(f"❌ {provider.name}.{method}: {e}")
+                served = {}
+            self._record(provider, (time.time() - started) / len(remaining), bool(served))
+            metrics.inc('lemon_provider_tickers_total', len(served), provider=provider.name, method=method, outcome='served')
+            metrics.inc('lemon_provider_tickers_total', len(remaining) - len(served),
+                        provider=provider.name, method=method, outcome='missed')
+            if position and served:
+                metrics.inc('lemon_provider_fallback_tickers_total', len(served), provider=provider.name, method=method)
+            results.update(served)
+            remaining = [t for t in remaining if t not in served]
+        return results
+
+    def history(self, tickers, interval='1d', period='1mo', start=None):
+        return self._call('history', tickers, (interval, period, start), by_latency=True)
+
+    def info(self, tickers):
+        # Only Yahoo has float/market cap, so fundamentals keep configured priority
+        return self._call('info', tickers, (), by_latency=False)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(h) for name, h in self.health.items()}
+
+def build_market_data():
+    """Provider chain selected by DATA_PROVIDER"""
+    if DATA_PROVIDER == 'replay':
+        return ProviderRouter([ReplayProvider(REPLAY_DATA_DIR)])
+    if DATA_PROVIDER == 'tradier':
+        return ProviderRouter([TradierProvider()])
+    providers = [YahooProvider()]
+    if DATA_PROVIDER == 'auto' and TRADIER_API_KEY:
+        providers.append(TradierProvider())
+    return ProviderRouter(providers)
+
+market_data = build_market_data()
+
+# ===== BAR CACHE =====
+# One process-wide cache of OHLCV history keyed by (ticker, interval, period),
+# so overlapping watchlists only hit Yahoo once per refresh.
+
+BAR_CACHE_MAX_BYTES = int(os.environ.get('BAR_CACHE_MAX_MB', 64)) * 1024 * 1024
+
+# Intraday bars go stale quickly; the forming daily bar is refreshed on
+# DAILY_BAR_LIVE_TTL during the session and then held until the next open.
+BAR_TTL_SECONDS = {
+    '1m': 30, '2m': 60, '5m': 60, '15m': 120, '30m': 180,
+    '60m': 300, '90m': 300, '1h': 300,
+}
+DAILY_BAR_LIVE_TTL = 600
+
+def next_market_open(now):
+    """Next 9:30 ET open strictly after `now` (weekends skipped, holidays ignored)"""
+    candidate = now.replace(hour=9, minute=30, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+def is_market_open(now):
+    """Regular session check: weekdays 9:30-16:00 ET"""
+    if now.weekday() >= 5:
+        return False
+    minutes = now.hour * 60 + now.minute
+    return 9 * 60 + 30 <= minutes < 16 * 60
+
+def bar_cache_ttl(ticker, interval):
+    """Seconds a freshly fetched set of bars stays valid"""
+    if interval in BAR_TTL_SECONDS:
+        return BAR_TTL_SECONDS[interval]
+    # Crypto trades around the clock, so its daily bar is always forming
+    if ticker.endswith('-USD'):
+        return DAILY_BAR_LIVE_TTL
+    now = datetime.now(MARKET_TZ)
+    if is_market_open(now):
+        return DAILY_BAR_LIVE_TTL
+    return (next_market_open(now) - now).total_seconds()
+
+class BarCache:
+    """Thread-safe LRU cache of history DataFrames with per-interval TTLs"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, nbytes, frame)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, ticker, interval, period):
+        key = (ticker, interval, period)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, nbytes, frame = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.total_bytes -= nbytes
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, ticker, interval, period, frame):
+        key = (ticker, interval, period)
+        nbytes = int(frame.memory_usage(deep=True).sum())
+        expires_at = time.time() + bar_cache_ttl(ticker, interval)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._entries[key] = (expires_at, nbytes, frame)
+            self.total_bytes += nbytes
+            # Evict least recently used until we're back under the cap
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRatio': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+bar_cache = BarCache(BAR_CACHE_MAX_BYTES)
+
+# ===== BAR STORE =====
+# Bars persist on disk between restarts, one memory-mapped .npy file per
+# ticker and interval, so a rescan only downloads the bars since the last one.
+
+BAR_STORE_DIR = os.environ.get('BAR_STORE_DIR', 'bar_store')
+BAR_STORE_ENABLED = os.environ.get('BAR_STORE_ENABLED', '1') == '1' and DATA_PROVIDER != 'replay'
+BAR_STORE_MAX_BARS = 5000
+BAR_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# A completed bar whose close moved more than this since we stored it means
+# Yahoo re-adjusted history (split/dividend), so the whole series is refetched
+ADJUSTMENT_TOLERANCE = 0.005
+
+def normalize_bars(frame):
+    """OHLCV only, float, sorted and timezone-aware; naive times are taken as exchange time"""
+    frame = frame[BAR_FIELDS].astype(float)
+    index = pd.DatetimeIndex(frame.index)
+    # Keep the provider's timezone: crypto daily bars are UTC midnights, not 20:00 ET the day before
+    frame.index = index.tz_localize(MARKET_TZ) if index.tz is None else index
+    frame = frame.sort_index()
+    return frame[~frame.index.duplicated(keep='last')]
+
+def covers_period(frame, period):
+    """Whether stored bars reach back as far as a fresh `period` fetch would"""
+    if period == 'max':
+        return True
+    count, unit = int(period.rstrip('dmoy') or 1), period.lstrip('0123456789')
+    now = pd.Timestamp.now(tz=MARKET_TZ)
+    if unit == 'd':
+        start = now - timedelta(days=count * 7 // 5)
+    elif unit == 'mo':
+        start = now - pd.DateOffset(months=count)
+    elif unit == 'y':
+        start = now - pd.DateOffset(years=count)
+    else:
+        return False
+    # Weekends and holidays mean the first real bar can be a few days later
+    return frame.index[0] <= start + timedelta(days=4)
+
+def merge_bars(stored, tail):
+    """Stored bars with the fresh tail appended, or None if history was re-adjusted"""
+    if tail.empty:
+        return stored
+    stored = stored.tz_convert(tail.index.tz)  # Files saved before timezones were kept are in exchange time
+    overlap = stored.index.intersection(tail.index)
+    if len(overlap) > 1:
+        # The last stored bar may have been partial; the one before it was final
+        check = overlap[-2]
+        before, after = stored.at[check, 'Close'], tail.at[check, 'Close']
+        if before and abs(after / before - 1) > ADJUSTMENT_TOLERANCE:
+            return None
+    merged = pd.concat([stored[stored.index < tail.index[0]], tail])
+    return merged.iloc[-BAR_STORE_MAX_BARS:]
+
+class BarStore:
+    """
+    [epoch seconds, Open, High, Low, Close, Volume] rows per (ticker, interval),
+    plus a .tz file naming the index timezone when it isn't exchange time
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, ticker, interval):
+        return os.path.join(self.root, interval, ticker.replace(os.sep, '_') + '.npy')
+
+    def load(self, ticker, interval):
+        path = self._path(ticker, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            rows = np.load(path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Bar store: unreadable {path}: {e}")
+            return None
+        if len(rows) == 0:
+            return None
+        tz = MARKET_TZ
+        tz_path = path[:-len('.npy')] + '.tz'
+        if os.path.exists(tz_path):
+            with open(tz_path, 'r') as f:
+                tz = f.read().strip()
+        index = pd.to_datetime(np.asarray(rows[:, 0], dtype=np.int64), unit='s', utc=True)
+        return pd.DataFrame(np.array(rows[:, 1:]), columns=BAR_FIELDS, index=index.tz_convert(tz))
+
+    def save(self, ticker, interval, frame):
+        path = self._path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        rows = np.empty((len(frame), 1 + len(BAR_FIELDS)))
+        rows[:, 0] = frame.index.as_unit('s').asi8
+        rows[:, 1:] = frame[BAR_FIELDS].to_numpy(dtype=float)
+        # Write then rename, so readers in other processes never see half a file
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        tz, tz_path = str(frame.index.tz), path[:-len('.npy')] + '.tz'
+        if tz != str(MARKET_TZ):
+            with open(tmp, 'w') as f:
+                f.write(tz)
+            os.replace(tmp, tz_path)
+        elif os.path.exists(tz_path):
+            os.remove(tz_path)
+        with open(tmp, 'wb') as f:
+            np.save(f, rows)
+        os.replace(tmp, path)
+
+bar_store = BarStore(BAR_STORE_DIR)
+
+def fetch_bars(tickers, period, interval='1d', stale=None):
+    """
+    Bars from the provider chain. With the bar store enabled, tickers we
+    already hold only fetch the bars since the last completed stored bar.
+    When that tail can't be fetched the stored bars are served as they are,
+    and their tickers are added to the `stale` set if one is given.
+    """
+    if not BAR_STORE_ENABLED:
+        return market_data.history(tickers, interval, period)
+
+    full = []
+    stored = {}
+    tails = {}  # start date -> tickers
+    for ticker in tickers:
+        frame = bar_store.load(ticker, interval)
+        if frame is None or len(frame) < 2 or not covers_period(frame, period):
+            full.append(ticker)
+        else:
+            stored[ticker] = frame
+            start = frame.index[-2].strftime('%Y-%m-%d')
+            tails.setdefault(start, []).append(ticker)
+
+    updated = {}
+    results = {}
+    for start, group in tails.items():
+        fresh = market_data.history(group, interval, period, start=start)
+        for ticker in group:
+            if ticker not in fresh:
+                # Upstream outage or 429: the stored bars beat dropping the ticker
+                print(f"⚠️  {ticker}: tail fetch failed, serving stored bars")
+                if stale is not None:
+                    stale.add(ticker)
+                results[ticker] = trim_to_period(stored[ticker], period)
+                continue
+            merged = merge_bars(stored[ticker], normalize_bars(fresh[ticker]))
+            if merged is None:
+                print(f"🔄 {ticker}: history re-adjusted, refetching")
+                full.append(ticker)
+            else:
+                updated[ticker] = merged
+
+    if full:
+        for ticker, hist in market_data.history(full, interval, period).items():
+            updated[ticker] = normalize_bars(hist)
+
+    for ticker, frame in updated.items():
+        try:
+            bar_store.save(ticker, interval, frame)
+        except OSError as e:
+            print(f"⚠️  Bar store: couldn't save {ticker}: {e}")
+        results[ticker] = trim_to_period(frame, period)
+    return results
+
+def fetch_history_batch(tickers, period, interval='1d'):
+    """
+    Cached multi-ticker history: {ticker: DataFrame}
+    Only cache misses go out to the bar store and provider chain, as one batch.
+    """
+    results = {}
+    missing = []
+    for ticker in tickers:
+        hist = bar_cache.get(ticker, interval, period)
+        if hist is not None:
+            results[ticker] = hist
+        else:
+            missing.append(ticker)
+
+    if missing:
+        stale = set()
+        with timed_stage('fetch'):
+            fetched = fetch_bars(missing, period, interval, stale=stale)
+        for ticker, hist in fetched.items():
+            # Stale stored bars aren't cached, so the next scan tries the tail again
+            if ticker not in stale:
+                bar_cache.put(ticker, interval, period, hist)
+            results[ticker] = hist
+
+    return results
+
+def get_history(ticker, period, interval='1d'):
+    """Cached replacement for yf.Ticker(ticker).history(period=..., interval=...)"""
+    return fetch_history_batch([ticker], period, interval).get(ticker, pd.DataFrame())
+
+# ===== FUNDAMENTALS CACHE =====
+# Scans only need a handful of `info` fields and they change at most daily,
+# so they're cached (and persisted) instead of fetched on every scan.
+
+FUNDAMENTAL_FIELDS = ('longName', 'marketCap', 'floatShares', 'sharesOutstanding',
+                      'fiftyTwoWeekHigh', 'fiftyTwoWeekLow')
+FUNDAMENTALS_TTL = 24 * 3600
+FUNDAMENTALS_MISS_TTL = 3600  # Retry tickers no provider had info for after an hour
+FUNDAMENTALS_PATH = os.environ.get('FUNDAMENTALS_PATH', os.path.join(BAR_STORE_DIR, 'fundamentals.json'))
+
+class FundamentalsCache:
+    """
+    Slim per-ticker fundamentals with a daily TTL
+    Stale entries are served immediately while one background thread
+    refreshes all of them in bulk; only never-seen tickers block a scan.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}  # ticker -> {'fields': {...}, 'fetched_at': epoch seconds}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Fundamentals cache unreadable: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._entries)
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp, 'w') as f:
+                f.write(snapshot)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️  Fundamentals cache not saved: {e}")
+
+    def _is_stale(self, entry, now):
+        ttl = FUNDAMENTALS_TTL if entry['fields'] else FUNDAMENTALS_MISS_TTL
+        return now - entry['fetched_at'] > ttl
+
+    @timed('fundamentals')
+    def refresh(self, tickers):
+        """Fetch and store fundamentals for `tickers` in one bulk provider call"""
+        infos = market_data.info(tickers)
+        now = time.time()
+        with self._lock:
+            for ticker in tickers:
+                info = infos.get(ticker, {})
+                fields = {k: info[k] for k in FUNDAMENTAL_FIELDS if info.get(k) is not None}
+                self._entries[ticker] = {'fields': fields, 'fetched_at': now}
+                self._refreshing.discard(ticker)
+        self._save()
+
+    def _refresh_in_background(self, tickers):
+        with self._lock:
+            tickers = [t for t in tickers if t not in self._refreshing]
+            self._refreshing.update(tickers)
+        if not tickers:
+            return
+
+        def run():
+            try:
+                self.refresh(tickers)
+            except Exception as e:
+                print(f"❌ Fundamentals refresh failed: {e}")
+                with self._lock:
+                    self._refreshing.difference_update(tickers)
+
+        threading.Thread(target=run, daemon=True, name='fundamentals-refresh').start()
+
+    def get_many(self, tickers):
+        now = time.time()
+        cold, stale = [], []
+        with self._lock:
+            for ticker in tickers:
+                entry = self._entries.get(ticker)
+                if entry is None:
+                    cold.append(ticker)
+                elif self._is_stale(entry, now):
+                    stale.append(ticker)
+        if cold:
+            self.refresh(cold)
+        if stale:
+            self._refresh_in_background(stale)
+        with self._lock:
+            return {t: dict(self._entries[t]['fields']) for t in tickers if t in self._entries}
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'refreshing': len(self._refreshing)}
+
+fundamentals = FundamentalsCache(FUNDAMENTALS_PATH if DATA_PROVIDER != 'replay' else None)
+
+def fetch_watchlist(tickers, period, interval='1d'):
+    """
+    Bars and fundamentals for a whole watchlist, fetched concurrently
+    Both halves fan out on the fetch executor, so the scan costs about as
+    long as the slower of the two instead of their sum.
+    """
+    infos = {}
+
+    def load_infos():
+        try:
+            infos.update(get_infos(tickers))
+        except Exception as e:
+            print(f"❌ Fundamentals for watchlist: {e}")
+
+    info_thread = threading.Thread(target=load_infos, daemon=True, name='watchlist-info')
+    info_thread.start()
+    bars = fetch_history_batch(tickers, period, interval)
+    info_thread.join()
+    return bars, infos
+
+def get_infos(tickers):
+    """Cached slim fundamentals for many tickers: {ticker: {field: value}}"""
+    return fundamentals.get_many(tickers)
+
+def get_info(ticker):
+    """Cached slim replacement for yf.Ticker(ticker).info"""
+    return get_infos([ticker]).get(ticker, {})
 
 def safe_yf_ticker(ticker):
-    """Get stock data with Tradier fallback on rate limit"""
+    """Get stock data through the provider chain, with a Tradier quote as last resort"""
+    class Wrapper:
+        def __init__(self, i):
+            self.info = i
+
+    metrics.inc('lemon_ticker_lookups_total')
     try:
-        time.sleep(0.5)  # Gentle rate limiting
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period='3mo')
+        hist = get_history(ticker, DAILY_BASE_PERIOD)
         
         # Check if we got valid data
         if len(hist) >= 2:
-            print(f"✅ {ticker}: Yahoo")
-            return stock, hist, stock.info
+            info = get_info(ticker)
+            return Wrapper(info), hist, info
         else:
-            # Empty data = likely rate limited
-            print(f"⚠️  {ticker}: Yahoo returned empty, trying Tradier...")
-            raise Exception("Empty data from Yahoo")
+            # Empty data = likely rate limited everywhere
+            print(f"⚠️  {ticker}: providers returned empty, trying Tradier quote...")
+            raise Exception("Empty data from providers")
             
     except Exception as e:
         error_msg = str(e).lower()
@@ -85,10 +1409,10 @@ def safe_yf_ticker(ticker):
         # Try Tradier on any failure
         if '429' in error_msg or 'too many' in error_msg or 'empty data' in error_msg:
             quote = get_tradier_quote(ticker)
+            metrics.inc('lemon_tradier_fallback_total', outcome='success' if quote else 'failed')
             if quote:
                 print(f"🔄 {ticker}: Tradier SUCCESS")
                 # Create minimal compatible objects
-                import pandas as pd
                 hist = pd.DataFrame({
                     'Close': [float(quote.get('prevclose', 0) or 0), float(quote.get('last', 0) or 0)],
                     'Volume': [int(quote.get('average_volume', 0) or 0)] * 2,
@@ -96,9 +1420,6 @@ def safe_yf_ticker(ticker):
                     'Low': [float(quote.get('last', 0) or 0) * 0.99] * 2
                 })
                 info = {'symbol': ticker, 'shortName': ticker}
-                class Wrapper:
-                    def __init__(self, i):
-                        self.info = i
                 return Wrapper(info), hist, info
             else:
                 print(f"❌ {ticker}: Tradier also failed")
@@ -107,13 +1428,160 @@ def safe_yf_ticker(ticker):
             
     return None, None, None
 
-# Simple user storage (in-memory - for production use a database)
-users = {}
-user_favorites = {}
+# ===== USER STORE =====
+# Accounts and favorites in SQLite (WAL mode), so they survive restarts and
+# every worker sees the same rows. They live outside the bar store, which is
+# only a cache and safe to delete. On Railway the default is the attached
+# volume; without one, point USERS_DB_PATH at persistent storage or accounts
+# are lost on every deploy. Reads go through a per-process cache that is
+# dropped whenever any connection commits a change (PRAGMA data_version).
+
+USERS_DB_PATH = os.environ.get('USERS_DB_PATH') or os.path.join(
+    os.environ.get('RAILWAY_VOLUME_MOUNT_PATH') or 'data', 'users.db'
+)
+USERS_CACHE_SIZE = 1024  # Emails kept per cache, least recently used dropped first
+
+USERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (email TEXT PRIMARY KEY, name TEXT NOT NULL, password TEXT NOT NULL, created_at TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS favorites (
+    id INTEGER PRIMARY KEY, email TEXT NOT NULL, ticker TEXT NOT NULL, timeframe TEXT NOT NULL,
+    company TEXT, added_at TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS favorites_email_ticker_timeframe ON favorites (email, ticker, timeframe);
+CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+class UserStore:
+    """Users and favorites in one SQLite file; one connection per thread and process"""
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._watch = None  # (pid, connection) used only to read data_version
+        self._version = None
+        self._users = OrderedDict()  # email -> user row; unknown emails are never cached
+        self._favorites = OrderedDict()  # email -> [favorite, ...]
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        db = sqlite3.connect(path, timeout=10, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.executescript(USERS_SCHEMA)
+        db.close()
+
+    def _db(self):
+        # Connections must not cross a fork, so they are keyed by pid too
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._local.db.execute('PRAGMA synchronous=NORMAL')
+            self._local.pid = os.getpid()
+        return self._local.db
+
+    def _cached(self, kind, email, load):
+        """Read-through lookup, after dropping the cache if anyone committed since the last one"""
+        with self._lock:
+            if self._watch is None or self._watch[0] != os.getpid():
+                self._watch = (os.getpid(), sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                                            check_same_thread=False))
+            # data_version changes when any other connection commits; writes here use per-thread ones
+            version = self._watch[1].execute('PRAGMA data_version').fetchone()[0]
+            if version != self._version:
+                self._users, self._favorites, self._version = OrderedDict(), OrderedDict(), version
+            cache = self._users if kind == 'users' else self._favorites
+            if email in cache:
+                cache.move_to_end(email)
+                self.hits += 1
+                return cache[email]
+            self.misses += 1
+        value = load(email)
+        # Misses aren't cached, so sign-in attempts with made-up emails can't fill memory
+        if value is not None:
+            with self._lock:
+                if self._version == version:
+                    cache[email] = value
+                    if len(cache) > USERS_CACHE_SIZE:
+                        cache.popitem(last=False)
+        return value
+
+    # Users
+
+    def get_user(self, email):
+        """{'name', 'email', 'password', 'created_at'} or None"""
+        def load(email):
+            row = self._db().execute(
+                'SELECT name, password, created_at FROM users WHERE email = ?', (email,)
+            ).fetchone()
+            return {'name': row[0], 'email': email, 'password': row[1], 'created_at': row[2]} if row else None
+        return self._cached('users', email, load)
+
+    def add_user(self, name, email, password):
+        """False when the email is already registered"""
+        cursor = self._db().execute(
+            'INSERT OR IGNORE INTO users (email, name, password, created_at) VALUES (?, ?, ?, ?)',
+            (email, name, password, datetime.now().isoformat())
+        )
+        return cursor.rowcount == 1
+
+    # Favorites
+
+    def favorites(self, email):
+        """Favorites in the order they were added"""
+        def load(email):
+            rows = self._db().execute(
+                'SELECT ticker, company, timeframe, added_at FROM favorites WHERE email = ? ORDER BY id', (email,)
+            ).fetchall()
+            return [
+                {'ticker': ticker, 'company': company, 'timeframe': timeframe, 'added_at': added_at}
+                for ticker, company, timeframe, added_at in rows
+            ]
+        return self._cached('favorites', email, load)
+
+    def add_favorite(self, email, favorite):
+        """False when (ticker, timeframe) is already a favorite"""
+        cursor = self._db().execute(
+            'INSERT OR IGNORE INTO favorites (email, ticker, timeframe, company, added_at) VALUES (?, ?, ?, ?, ?)',
+            (email, favorite['ticker'], favorite['timeframe'], favorite['company'], favorite['added_at'])
+        )
+        return cursor.rowcount == 1
+
+    def remove_favorite(self, email, ticker, timeframe):
+        self._db().execute(
+            'DELETE FROM favorites WHERE email = ? AND ticker = ? AND timeframe = ?', (email, ticker, timeframe)
+        )
+
+    # Settings
+
+    def secret_key(self):
+        """Session signing key shared by every worker, generated on first use"""
+        db = self._db()
+        db.execute('INSERT OR IGNORE INTO settings (name, value) VALUES (?, ?)', ('secret_key', secrets.token_hex(32)))
+        return db.execute('SELECT value FROM settings WHERE name = ?', ('secret_key',)).fetchone()[0]
+
+    def stats(self):
+        db = self._db()
+        with self._lock:
+            cached = len(self._users) + len(self._favorites)
+        return {
+            'path': self.path,
+            'users': db.execute('SELECT COUNT(*) FROM users').fetchone()[0],
+            'favorites': db.execute('SELECT COUNT(*) FROM favorites').fetchone()[0],
+            'cached': cached,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+user_store = UserStore(USERS_DB_PATH)
+if os.environ.get('RAILWAY_ENVIRONMENT') and not (os.environ.get('USERS_DB_PATH') or os.environ.get('RAILWAY_VOLUME_MOUNT_PATH')):
+    print("⚠️  No volume attached: accounts and favorites will be lost on the next deploy (set USERS_DB_PATH)")
+
+# Sessions must verify in every worker and survive restarts, so the key is
+# SECRET_KEY when set, else one generated once and kept in the user store
+app.secret_key = os.environ.get('SECRET_KEY') or user_store.secret_key()
 
 # Load high short interest stocks
 def load_stock_data():
-    """Load stocks from CSV - LIMITED TO TOP 30"""
+    """Load stocks from CSV, highest short interest first"""
     stocks = []
     csv_path = 'high_short_stocks.csv'
     
@@ -135,9 +1603,8 @@ def load_stock_data():
                     except ValueError:
                         continue
     
-    # LIMIT TO TOP 30 HIGHEST SHORT INTEREST
     stocks.sort(key=lambda x: x['short_interest'], reverse=True)
-    return stocks[:30]
+    return stocks
 
 def calculate_risk_score(short_interest, daily_change, volume_ratio, days_to_cover, float_shares):
     """Calculate risk score 0-100"""
@@ -175,6 +1642,92 @@ def calculate_risk_score(short_interest, daily_change, volume_ratio, days_to_cov
     
     return round(risk_score, 1)
 
+@timed('scoring')
+def calculate_risk_scores(short_interest, daily_change, volume_ratio, days_to_cover, float_shares):
+    """Vectorized calculate_risk_score over whole arrays of candidates"""
+    short_interest = np.asarray(short_interest, dtype=float)
+    daily_change = np.asarray(daily_change, dtype=float)
+    volume_ratio = np.asarray(volume_ratio, dtype=float)
+    days_to_cover = np.asarray(days_to_cover, dtype=float)
+    float_shares = np.asarray(float_shares, dtype=float)
+    
+    short_score = np.minimum(short_interest * 2, 100)
+    gain_score = np.minimum(daily_change * 2, 100)
+    vol_score = np.minimum(volume_ratio * 20, 100)
+    
+    dtc_score = np.select(
+        [days_to_cover < 1, days_to_cover <= 10],
+        [days_to_cover * 20, 100],
+        default=np.maximum(100 - (days_to_cover - 10) * 5, 0)
+    )
+    
+    float_millions = np.where(float_shares > 0, float_shares / 1_000_000, 999)
+    float_score = np.select(
+        [float_millions < 50, float_millions < 100, float_millions < 200, float_millions < 500],
+        [100, 80, 60, 40],
+        default=20
+    )
+    
+    risk_score = (
+        short_score * 0.30 +
+        gain_score * 0.25 +
+        vol_score * 0.20 +
+        dtc_score * 0.15 +
+        float_score * 0.10
+    )
+    
+    return np.round(risk_score, 1)
+
+@timed('volume')
+def squeeze_metrics(close, volume):
+    """
+    Price/volume metrics for stacked (n_tickers, VOLUME_BASELINE_WINDOW + 1)
+    Close and Volume windows: daily change, and the last bar's volume
+    against the average of the bars before it
+    """
+    current_price = close[:, -1]
+    previous_close = close[:, -2]
+    current_volume = np.nan_to_num(volume[:, -1])
+    avg_volume = rolling_volume(volume, [VOLUME_BASELINE_WINDOW])[VOLUME_BASELINE_WINDOW]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily_change = (current_price - previous_close) / previous_close * 100
+        volume_ratio = np.where(avg_volume > 0, current_volume / avg_volume, 1.0)
+    
+    return {
+        'current_price': current_price,
+        'previous_close': previous_close,
+        'daily_change': daily_change,
+        'current_volume': current_volume,
+        'avg_volume': avg_volume,
+        'volume_ratio': volume_ratio
+    }
+
+def strat_31_pattern_data(hist):
+    """JSON description of a 3-1 ending on the last bar of `hist`"""
+    current = hist.iloc[-1]
+    previous = hist.iloc[-2]
+    
+    direction = "bullish" if current['Close'] > current['Open'] else "bearish"
+    
+    return {
+        'has_pattern': True,
+        'direction': direction,
+        'three_candle': {
+            'high': float(previous['High']),
+            'low': float(previous['Low']),
+            'close': float(previous['Close']),
+            'date': previous.name.strftime('%Y-%m-%d')
+        },
+        'one_candle': {
+            'high': float(current['High']),
+            'low': float(current['Low']),
+            'close': float(current['Close']),
+            'open': float(current['Open']),
+            'date': current.name.strftime('%Y-%m-%d')
+        }
+    }
+
 def check_strat_31(hist):
     """
     Check if stock has a 3-1 pattern (The Strat)
@@ -192,60 +1745,312 @@ def check_strat_31(hist):
     is_one = (current['High'] < previous['High'] and 
               current['Low'] > previous['Low'])
     
-    direction = "bullish" if current['Close'] > current['Open'] else "bearish"
-    
     if is_three and is_one:
-        pattern_data = {
-            'has_pattern': True,
-            'direction': direction,
-            'three_candle': {
-                'high': float(previous['High']),
-                'low': float(previous['Low']),
-                'close': float(previous['Close']),
-                'date': previous.name.strftime('%Y-%m-%d')
-            },
-            'one_candle': {
-                'high': float(current['High']),
-                'low': float(current['Low']),
-                'close': float(current['Close']),
-                'open': float(current['Open']),
-                'date': current.name.strftime('%Y-%m-%d')
-            }
-        }
-        return True, pattern_data
+        return True, strat_31_pattern_data(hist)
     
     return False, None
 
-# COMBINED STOCK LIST FOR WEEKLY/HOURLY PLAYS
-def get_combined_weekly_hourly_list():
-    """
-    Combine Daily Plays + Volemon lists for Weekly/Hourly scans
-    Remove duplicates
-    """
-    daily_plays = [
-        'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'AMD',
-        'SPY', 'QQQ', 'IWM', 'DIA',
-        'NFLX', 'DIS', 'BABA', 'PYPL', 'SQ', 'ROKU', 'SNAP', 'UBER',
-        'F', 'GM', 'NIO', 'LCID', 'RIVN',
-        'BA', 'GE', 'CAT', 'DE',
-        'JPM', 'BAC', 'GS', 'MS', 'C',
-        'XOM', 'CVX', 'COP', 'SLB',
-        'PFE', 'JNJ', 'MRNA', 'BNTX',
-        'WMT', 'TGT', 'COST', 'HD', 'LOW',
-    ]
+# ===== STRAT PATTERN ENGINE =====
+# Classifies every bar of many tickers at once with NumPy. Bar types match
+# check_strat_31: 1 and 3 need strictly inside/outside ranges, 2-up/2-down
+# take out only one side, and bars that merely tie the prior range are 0.
+
+BAR_NONE, BAR_INSIDE, BAR_2UP, BAR_2DOWN, BAR_OUTSIDE = 0, 1, 2, -2, 3
+BAR_LABELS = {BAR_NONE: None, BAR_INSIDE: '1', BAR_2UP: '2u', BAR_2DOWN: '2d', BAR_OUTSIDE: '3'}
+
+_ANY_2 = (BAR_2UP, BAR_2DOWN)
+
+# Pattern name -> allowed bar types for each bar, oldest first, ending on the latest bar
+STRAT_PATTERNS = {
+    '3-1': ((BAR_OUTSIDE,), (BAR_INSIDE,)),
+    '3-1-2': ((BAR_OUTSIDE,), (BAR_INSIDE,), _ANY_2),
+    '2-1-2': (_ANY_2, (BAR_INSIDE,), _ANY_2),
+    '1-2-2': ((BAR_INSIDE,), _ANY_2, _ANY_2),
+    '3-2-2': ((BAR_OUTSIDE,), _ANY_2, _ANY_2),
+    '2d-2u': ((BAR_2DOWN,), (BAR_2UP,)),
+    '2u-2d': ((BAR_2UP,), (BAR_2DOWN,)),
+}
+
+def stack_bars(frames, tickers, length=None, fields=('Open', 'High', 'Low', 'Close')):
+    """
+    Right-align each ticker's bars into {field: (n_tickers, length) array},
+    NaN-padded on the left for shorter histories
+    """
+    if length is None:
+        length = max((len(frames[t]) for t in tickers), default=0)
+    stacked = np.full((len(fields), len(tickers), length), np.nan)
+    for i, ticker in enumerate(tickers):
+        frame = frames[ticker]
+        n = min(len(frame), length)
+        if n:
+            # Column by column: selecting a sub-frame first costs more than the copy itself
+            for k, field in enumerate(fields):
+                stacked[k, i, length - n:] = frame[field].to_numpy(dtype=float)[-n:]
+    return {field: stacked[k] for k, field in enumerate(fields)}
+
+def classify_bars(high, low):
+    """Strat bar type for every bar; the first column (no prior bar) is BAR_NONE"""
+    codes = np.zeros(high.shape, dtype=np.int8)
+    if high.shape[-1] < 2:
+        return codes
+    h, l = high[..., 1:], low[..., 1:]
+    prev_h, prev_l = high[..., :-1], low[..., :-1]
+    took_high = h > prev_h
+    took_low = l < prev_l
+    codes[..., 1:] = np.select(
+        [took_high & took_low, (h < prev_h) & (l > prev_l), took_high, took_low],
+        [BAR_OUTSIDE, BAR_INSIDE, BAR_2UP, BAR_2DOWN],
+        default=BAR_NONE
+    )
+    return codes
+
+def detect_patterns(codes, patterns=None):
+    """{pattern: bool array shaped like codes}, True where the pattern ends on that bar"""
+    matches = {}
+    for name in (patterns or STRAT_PATTERNS):
+        spec = STRAT_PATTERNS[name]
+        hit = np.zeros(codes.shape, dtype=bool)
+        span = len(spec)
+        # A pattern of k bar types needs k + 1 bars, since bar 0 has no type
+        if codes.shape[-1] > span:
+            window = np.ones(codes[..., span:].shape, dtype=bool)
+            for offset, allowed in enumerate(spec):
+                end = codes.shape[-1] - span + offset + 1
+                window &= np.isin(codes[..., offset + 1:end], allowed)
+            hit[..., span:] = window
+        matches[name] = hit
+    return matches
+
+@timed('patterns')
+def strat_matches(frames, pattern='3-1'):
+    """Tickers whose latest bar completes `pattern`, checked for all tickers in one pass"""
+    span = len(STRAT_PATTERNS[pattern])
+    tickers = [t for t, hist in frames.items() if hist is not None and len(hist) > span]
+    if not tickers:
+        return []
+    bars = stack_bars(frames, tickers, length=span + 1, fields=('High', 'Low'))
+    hits = detect_patterns(classify_bars(bars['High'], bars['Low']), [pattern])[pattern][:, -1]
+    return [tickers[i] for i in np.flatnonzero(hits)]
+
+# ===== VOLUME STATISTICS =====
+# One definition of "average volume" for every scanner: the mean of the
+# completed bars before the latest one, over configurable windows.
+
+VOLUME_BASELINE_WINDOW = 20  # Window behind avgVolume and the volume ratios
+# Always includes the baseline window, which every scanner reads
+VOLUME_WINDOWS = tuple(sorted(
+    {int(w) for w in os.environ.get('VOLUME_WINDOWS', '5,20,50').split(',') if w.strip()} | {VOLUME_BASELINE_WINDOW}
+))
+INTRADAY_RVOL_INTERVAL = '15m'
+INTRADAY_RVOL_PERIOD = '1mo'  # Sessions that make up the time-of-day baseline
+
+def rolling_volume(volume, windows=None):
+    """
+    Average volume of the bars before the last one, for every window at once
+    `volume` is a stacked (n_tickers, length) array, NaN-padded on the left;
+    shorter histories average what they have. Returns {window: (n_tickers,) array}.
+    """
+    windows = windows or VOLUME_WINDOWS
+    prior = volume[:, :-1][:, ::-1]  # Most recent completed bar first
+    sums = np.cumsum(np.nan_to_num(prior), axis=1)
+    counts = np.cumsum(~np.isnan(prior), axis=1)
+    averages = {}
+    for window in windows:
+        if prior.shape[1] == 0:
+            averages[window] = np.zeros(len(volume))
+            continue
+        k = min(window, prior.shape[1]) - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            averages[window] = np.where(counts[:, k] > 0, sums[:, k] / counts[:, k], 0.0)
+    return averages
+
+@timed('volume')
+def volume_stats(frames, tickers, windows=None):
+    """Latest volume plus its average and ratio for every window, for many tickers in one pass"""
+    windows = windows or VOLUME_WINDOWS
+    volume = stack_bars(frames, tickers, length=max(windows) + 1, fields=('Volume',))['Volume']
+    current = np.nan_to_num(volume[:, -1])
+    averages = rolling_volume(volume, windows)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = {w: np.where(avg > 0, current / avg, 1.0) for w, avg in averages.items()}
+    return {'current': current, 'avg': averages, 'ratio': ratios}
+
+@timed('volume')
+def intraday_relative_volume(frames):
+    """
+    Today's volume so far against the average volume traded by the same time
+    of day in the previous sessions: {ticker: ratio}. Lets a scan flag
+    unusual volume mid-session instead of comparing a partial day to full ones.
+    """
+    volumes = {
+        t: hist['Volume'] for t, hist in frames.items()
+        if hist is not None and len(hist) and isinstance(hist.index, pd.DatetimeIndex)
+    }
+    if not volumes:
+        return {}
+    series = pd.concat(volumes, names=['ticker', 'time'])
+    times = series.index.get_level_values('time')
+    if times.tz is not None:
+        times = times.tz_convert(MARKET_TZ)
+    slot = times.hour * 60 + times.minute
     
-    volemon = [
-        'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'AMD',
-        'SPY', 'QQQ', 'IWM', 'DIA',
-        'NFLX', 'DIS', 'BABA', 'PYPL', 'SQ', 'ROKU', 'SNAP', 'UBER',
-        'F', 'GM', 'NIO', 'LCID', 'RIVN',
-        'JPM', 'BAC', 'GS', 'MS', 'C',
-        'XOM', 'CVX', 'COP', 'SLB',
-    ]
+    # Sessions x time-of-day slots of cumulative volume, for every ticker in one groupby
+    table = series.groupby([series.index.get_level_values('ticker'), times.normalize(), slot]).sum()
+    cumulative = table.unstack(fill_value=0).sort_index(axis=1).cumsum(axis=1)
+    
+    ratios = {}
+    for ticker, sessions in cumulative.groupby(level=0):
+        if len(sessions) < 2:
+            continue
+        last = volumes[ticker].index[-1]
+        if last.tzinfo is not None:
+            last = last.tz_convert(MARKET_TZ)
+        last_slot = last.hour * 60 + last.minute
+        today = sessions.iloc[-1][last_slot]
+        baseline = sessions.iloc[:-1][last_slot].mean()
+        if baseline > 0:
+            ratios[ticker] = float(today / baseline)
+    return ratios
+
+# ===== TIMEFRAMES =====
+# Every Strat timeframe comes from one of two base downloads per ticker: a
+# year of daily bars (daily, weekly, monthly) and a month of hourly bars
+# (hourly, 4-hour). Derived bars are aggregated for all tickers at once
+# and reused until their base bars change.
+
+DAILY_BASE_PERIOD = '1y'
+HOURLY_BASE_PERIOD = '1mo'
+
+TIMEFRAMES = {
+    # name: (base interval, base period, resample rule or None for the base bars)
+    'hourly': ('1h', HOURLY_BASE_PERIOD, None),
+    '4h': ('1h', HOURLY_BASE_PERIOD, '4h'),
+    'daily': ('1d', DAILY_BASE_PERIOD, None),
+    'weekly': ('1d', DAILY_BASE_PERIOD, 'W'),
+    'monthly': ('1d', DAILY_BASE_PERIOD, 'MS'),
+}
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+RESAMPLE_OPTIONS = {'4h': {'origin': 'start_day', 'offset': '9h30min'}}  # 9:30-13:30, 13:30-close
+
+@timed('resample')
+def resample_bars(frames, rule):
+    """
+    Aggregate many tickers' OHLCV bars to `rule` in one pass: {ticker: DataFrame}
+    All tickers are lined up in one wide (ticker, field) frame and each field
+    is resampled once; frames in different timezones (crypto is UTC) are kept apart.
+    Bins are cut in local wall time, so 4-hour bars stay on 9:30/13:30 across DST changes.
+    """
+    by_tz = {}
+    for ticker, frame in frames.items():
+        if frame is not None and len(frame):
+            by_tz.setdefault(str(frame.index.tz), {})[ticker] = frame[list(OHLCV_AGG)]
+    
+    results = {}
+    for group in by_tz.values():
+        wide = pd.concat(group, axis=1)
+        tz = wide.index.tz
+        if tz is not None:
+            wide.index = wide.index.tz_localize(None)
+        fields = wide.columns.get_level_values(1)
+        aggregated = pd.concat([
+            getattr(wide.loc[:, fields == field].resample(rule, **RESAMPLE_OPTIONS.get(rule, {})), how)()
+            for field, how in OHLCV_AGG.items()
+        ], axis=1)
+        if tz is not None:
+            aggregated.index = aggregated.index.tz_localize(tz, ambiguous=False, nonexistent='shift_forward')
+        
+        # Slice each ticker's block straight out of the array; pandas indexing per ticker costs more than the resample
+        columns = pd.MultiIndex.from_product([list(group), list(OHLCV_AGG)])
+        values = aggregated.reindex(columns=columns).to_numpy()
+        width = len(OHLCV_AGG)
+        for i, ticker in enumerate(group):
+            block = values[:, i * width:(i + 1) * width]
+            keep = ~np.isnan(block[:, 0])
+            results[ticker] = pd.DataFrame(block[keep], index=aggregated.index[keep], columns=list(OHLCV_AGG))
+    return results
+
+class DerivedBars:
+    """Resampled bars per (ticker, timeframe), reused while the base frame is the same object"""
+
+    def __init__(self):
+        self._entries = {}  # (ticker, timeframe) -> (base frame, derived frame)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, frames, timeframe, rule):
+        results, stale = {}, {}
+        with self._lock:
+            for ticker, frame in frames.items():
+                entry = self._entries.get((ticker, timeframe))
+                if entry is not None and entry[0] is frame:
+                    results[ticker] = entry[1]
+                    self.hits += 1
+                else:
+                    stale[ticker] = frame
+                    self.misses += 1
+        
+        if stale:
+            derived = resample_bars(stale, rule)
+            with self._lock:
+                for ticker, frame in derived.items():
+                    self._entries[(ticker, timeframe)] = (stale[ticker], frame)
+            results.update(derived)
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+derived_bars = DerivedBars()
+
+def timeframe_bars(tickers, timeframes=('daily',)):
+    """
+    Bars for several Strat timeframes from one base download per interval:
+    {timeframe: {ticker: DataFrame}}
+    """
+    bases = {}
+    for timeframe in timeframes:
+        interval, period, _ = TIMEFRAMES[timeframe]
+        if (interval, period) not in bases:
+            bases[(interval, period)] = fetch_history_batch(tickers, period, interval)
     
-    # Combine and remove duplicates
-    combined = list(set(daily_plays + volemon))
-    return sorted(combined)
+    results = {}
+    for timeframe in timeframes:
+        interval, period, rule = TIMEFRAMES[timeframe]
+        base = bases[(interval, period)]
+        results[timeframe] = derived_bars.get_many(base, timeframe, rule) if rule else base
+    return results
+
+# ===== UNIVERSES =====
+# Every scanner's watchlist, defined once. Volemon watches the liquid core;
+# daily plays add industrials, pharma and retail on top of it.
+
+VOLEMON_TICKERS = [
+    'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'AMD',
+    'SPY', 'QQQ', 'IWM', 'DIA',
+    'NFLX', 'DIS', 'BABA', 'PYPL', 'SQ', 'ROKU', 'SNAP', 'UBER',
+    'F', 'GM', 'NIO', 'LCID', 'RIVN',
+    'JPM', 'BAC', 'GS', 'MS', 'C',
+    'XOM', 'CVX', 'COP', 'SLB',
+]
+
+DAILY_PLAYS_TICKERS = VOLEMON_TICKERS + [
+    'BA', 'GE', 'CAT', 'DE',
+    'PFE', 'JNJ', 'MRNA', 'BNTX',
+    'WMT', 'TGT', 'COST', 'HD', 'LOW',
+]
+
+# Weekly/hourly plays scan Daily Plays + Volemon, without duplicates
+WEEKLY_HOURLY_TICKERS = sorted(set(DAILY_PLAYS_TICKERS + VOLEMON_TICKERS))
+
+CRYPTO_TICKERS = {
+    'BTC-USD': 'Bitcoin',
+    'ETH-USD': 'Ethereum',
+    'XRP-USD': 'Ripple',
+    'SOL-USD': 'Solana',
+    'DOGE-USD': 'Dogecoin'
+}
 
 @app.route('/')
 def index():
@@ -282,22 +2087,15 @@ def signup():
         if not name or not email or not password:
             return jsonify({'success': False, 'error': 'All fields are required'}), 400
         
-        if email in users:
+        if user_store.get_user(email) is not None:
             return jsonify({'success': False, 'error': 'Email already registered'}), 400
         
         if len(password) < 6:
             return jsonify({'success': False, 'error': 'Password must be at least 6 characters'}), 400
         
-        # Create user
-        users[email] = {
-            'name': name,
-            'email': email,
-            'password': hash_password(password),
-            'created_at': datetime.now().isoformat()
-        }
-        
-        # Initialize favorites
-        user_favorites[email] = []
+        # Create user; another worker may have registered the email since the check
+        if not user_store.add_user(name, email, hash_password(password)):
+            return jsonify({'success': False, 'error': 'Email already registered'}), 400
         
         # Create session
         session['user_email'] = email
@@ -323,10 +2121,11 @@ def signin():
         if not email or not password:
             return jsonify({'success': False, 'error': 'Email and password required'}), 400
         
-        if email not in users:
+        user = user_store.get_user(email)
+        if user is None:
             return jsonify({'success': False, 'error': 'Invalid email or password'}), 401
         
-        if users[email]['password'] != hash_password(password):
+        if user['password'] != hash_password(password):
             return jsonify({'success': False, 'error': 'Invalid email or password'}), 401
         
         # Create session
@@ -335,7 +2134,7 @@ def signin():
         return jsonify({
             'success': True,
             'user': {
-                'name': users[email]['name'],
+                'name': user['name'],
                 'email': email
             }
         })
@@ -347,15 +2146,16 @@ def get_current_user():
     """Get current logged-in user"""
     try:
         user_email = session.get('user_email')
+        user = user_store.get_user(user_email) if user_email else None
         
-        if not user_email or user_email not in users:
+        if user is None:
             # Allow guest mode - return success with no user
             return jsonify({'success': True, 'user': None})
         
         return jsonify({
             'success': True,
             'user': {
-                'name': users[user_email]['name'],
+                'name': user['name'],
                 'email': user_email
             }
         })
@@ -380,7 +2180,7 @@ def get_favorites():
         if not user_email:
             return jsonify({'success': False, 'error': 'Not authenticated'}), 401
         
-        favorites = user_favorites.get(user_email, [])
+        favorites = user_store.favorites(user_email)
         
         return jsonify({
             'success': True,
@@ -406,15 +2206,7 @@ def add_favorite():
         if not ticker:
             return jsonify({'success': False, 'error': 'Ticker required'}), 400
         
-        if user_email not in user_favorites:
-            user_favorites[user_email] = []
-        
-        # Check if already favorited
-        for fav in user_favorites[user_email]:
-            if fav['ticker'] == ticker and fav['timeframe'] == timeframe:
-                return jsonify({'success': False, 'error': 'Already in favorites'}), 400
-        
-        # Add favorite
+        # Add favorite; the (email, ticker, timeframe) index rejects duplicates
         favorite = {
             'ticker': ticker,
             'company': company,
@@ -422,7 +2214,8 @@ def add_favorite():
             'added_at': datetime.now().isoformat()
         }
         
-        user_favorites[user_email].append(favorite)
+        if not user_store.add_favorite(user_email, favorite):
+            return jsonify({'success': False, 'error': 'Already in favorites'}), 400
         
         return jsonify({
             'success': True,
@@ -440,14 +2233,11 @@ def remove_favorite(ticker, timeframe):
         if not user_email:
             return jsonify({'success': False, 'error': 'Not authenticated'}), 401
         
-        if user_email not in user_favorites:
+        if not user_store.favorites(user_email):
             return jsonify({'success': False, 'error': 'No favorites found'}), 404
         
         # Remove favorite
-        user_favorites[user_email] = [
-            fav for fav in user_favorites[user_email]
-            if not (fav['ticker'] == ticker.upper() and fav['timeframe'] == timeframe)
-        ]
+        user_store.remove_favorite(user_email, ticker.upper(), timeframe)
         
         return jsonify({'success': True})
     except Exception as e:
@@ -455,92 +2245,1466 @@ def remove_favorite(ticker, timeframe):
 
 # ===== END AUTHENTICATION ENDPOINTS =====
 
-@app.route('/api/scan', methods=['POST'])
-def scan():
-    """API endpoint to scan for squeeze candidates - TOP 30 ONLY"""
-    try:
-        data = request.json
-        min_short = float(data.get('minShort', 25))
-        min_gain = float(data.get('minGain', 15))
-        min_vol_ratio = float(data.get('minVolRatio', 1.5))
-        min_risk = float(data.get('minRisk', 60))
+# ===== SCAN EVENTS =====
+# Scanners work through their watchlist in chunks and publish progress and
+# match events as they go, so streaming endpoints can show results early.
+
+SCAN_CHUNK_SIZE = int(os.environ.get('SCAN_CHUNK_SIZE', 2 * FETCH_WORKERS))
+
+class ScanEventHub:
+    """
+    Fans scan events out to every stream subscribed to that scan key.
+    Events of the run in progress are kept, so late subscribers catch up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # key -> [Queue, ...]
+        self._history = {}  # key -> events of the run in progress
+
+    def begin(self, key):
+        with self._lock:
+            self._history[key] = []
+
+    def end(self, key):
+        with self._lock:
+            self._history.pop(key, None)
+
+    def subscribe(self, key):
+        events = queue.Queue()
+        with self._lock:
+            for event in self._history.get(key, []):
+                events.put(event)
+            self._subscribers.setdefault(key, []).append(events)
+        return events
+
+    def unsubscribe(self, key, events):
+        with self._lock:
+            subscribers = self._subscribers.get(key, [])
+            if events in subscribers:
+                subscribers.remove(events)
+            if not subscribers:
+                self._subscribers.pop(key, None)
+
+    def publish(self, key, event):
+        with self._lock:
+            if key in self._history:
+                self._history[key].append(event)
+            for events in self._subscribers.get(key, []):
+                events.put(event)
+
+scan_events = ScanEventHub()
+scan_context = threading.local()  # .key of the scan running on this thread
+
+def emit_scan_event(event_type, **data):
+    """Publish an event for the scan running on this thread, if anyone listens"""
+    key = getattr(scan_context, 'key', None)
+    if key is not None:
+        scan_events.publish(key, dict(data, type=event_type))
+
+def scan_chunks(tickers, size=None):
+    """Yield a watchlist in chunks, emitting a progress event after each one"""
+    size = size or SCAN_CHUNK_SIZE
+    total = len(tickers)
+    for start in range(0, total, size):
+        yield tickers[start:start + size]
+        emit_scan_event('progress', done=min(start + size, total), total=total)
+
+# ===== INCREMENTAL RESCANS =====
+# Volemon and Usuals rescan the same watchlist every few minutes. Each keeps
+# per-ticker state between runs so a rescan only folds in the new bars and
+# recomputes tickers whose latest bar actually changed.
+
+class IncrementalScan:
+    """
+    Per-ticker rolling state for one scanner: the latest bar seen, running
+    sums of the completed volumes for every VOLUME_WINDOWS window, and the
+    last result
+    """
+
+    def __init__(self, name, windows=None):
+        self.name = name
+        self.windows = windows or VOLUME_WINDOWS
+        self.states = {}
+        self.recomputed = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def _rebuild(self, hist):
+        volumes = list(hist['Volume'].iloc[:-1].tail(max(self.windows)).astype(float))
+        sums = {w: float(sum(volumes[-w:])) for w in self.windows}
+        return {'volumes': deque(volumes), 'sums': sums}
+
+    def _push(self, state, volume):
+        """Slide every window forward by one completed bar"""
+        volumes = state['volumes']
+        volumes.append(volume)
+        for w in self.windows:
+            state['sums'][w] += volume
+            if len(volumes) > w:
+                state['sums'][w] -= volumes[-w - 1]
+        if len(volumes) > max(self.windows):
+            volumes.popleft()
+
+    def update(self, ticker, hist):
+        """
+        Fold `hist` into the ticker's state; returns (state, changed) where
+        `changed` is False when the latest bar is exactly what was seen last time
+        """
+        last_bar = hist.index[-1]
+        tail = tuple(hist[['Open', 'High', 'Low', 'Close', 'Volume']].iloc[-1].astype(float))
+        with self._lock:
+            state = self.states.get(ticker)
+            if state is not None and state['last_bar'] == last_bar and state['tail'] == tail and 'result' in state:
+                self.reused += 1
+                return state, False
+
+            if state is None or last_bar < state['last_bar'] or state['last_bar'] not in hist.index:
+                # First sight, or history was rewritten: start over from the bars at hand
+                state = self._rebuild(hist)
+            else:
+                # Bars from the previously forming one up to (not including) the new last bar are now complete
+                completed = hist['Volume'][(hist.index >= state['last_bar']) & (hist.index < last_bar)]
+                for volume in completed.astype(float):
+                    self._push(state, volume)
+                state.pop('result', None)
+
+            state['last_bar'] = last_bar
+            state['tail'] = tail
+            self.states[ticker] = state
+            self.recomputed += 1
+            return state, True
+
+    def average_volume(self, state, window=VOLUME_BASELINE_WINDOW):
+        count = min(window, len(state['volumes']))
+        return state['sums'][window] / count if count else 0.0
+
+    def stats(self):
+        with self._lock:
+            return {'tickers': len(self.states), 'recomputed': self.recomputed, 'reused': self.reused}
+
+volemon_state = IncrementalScan('volemon')
+usuals_state = IncrementalScan('usuals')
+
+# ===== SCANNERS =====
+# Each scanner works through its whole watchlist and returns result dicts;
+# request parameters are applied afterwards so one run can serve every caller.
+
+# The shared squeeze scan only fully scores stocks above these; requests
+# asking for looser thresholds get a scan of their own
+SQUEEZE_PREFILTER_MIN_GAIN = float(os.environ.get('SQUEEZE_PREFILTER_MIN_GAIN', 5))
+SQUEEZE_PREFILTER_MIN_VOL_RATIO = float(os.environ.get('SQUEEZE_PREFILTER_MIN_VOL_RATIO', 1.0))
+# Both stages read the same bars, so the prefilter's gain and volume ratio are
+# exactly the ones a candidate is scored with, and stage two's fetch is a cache hit
+SQUEEZE_HISTORY_PERIOD = '3mo'
+
+DEFAULT_USUALS = ['SOFI', 'INTC', 'SPY', 'TSLA', 'COIN', 'CDE', 'PLTR', 'AAPL', 'BAC', 'NVDA', 'GOOGL', 'META', 'MSFT', 'UNH']
+
+def squeeze_prefilter(stocks, min_gain, min_vol_ratio):
+    """Stage one: one cheap batched pass over the whole list, keeping movers only"""
+    quotes = fetch_history_batch([stock['ticker'] for stock in stocks], SQUEEZE_HISTORY_PERIOD)
+    stocks = [s for s in stocks if s['ticker'] in quotes and len(quotes[s['ticker']]) >= 2]
+    if not stocks:
+        return []
+    
+    window = stack_bars(quotes, [s['ticker'] for s in stocks], length=VOLUME_BASELINE_WINDOW + 1, fields=('Close', 'Volume'))
+    m = squeeze_metrics(window['Close'], window['Volume'])
+    keep = (m['daily_change'] >= min_gain) & (m['volume_ratio'] >= min_vol_ratio)
+    
+    return [stock for stock, passed in zip(stocks, keep) if passed]
+
+def score_squeeze_candidates(stocks):
+    """Stage two: full history and fundamentals, scored in one vectorized pass"""
+    bars, infos = fetch_watchlist([stock['ticker'] for stock in stocks], SQUEEZE_HISTORY_PERIOD)
+    stocks = [s for s in stocks if s['ticker'] in bars and len(bars[s['ticker']]) >= 2]
+    if not stocks:
+        return []
+    tickers = [s['ticker'] for s in stocks]
+    
+    # Derived metrics and scores for every candidate at once
+    window = stack_bars(bars, tickers, length=VOLUME_BASELINE_WINDOW + 1, fields=('Close', 'Volume'))
+    m = squeeze_metrics(window['Close'], window['Volume'])
+    
+    short_interest = np.array([s['short_interest'] for s in stocks], dtype=float)
+    float_shares = np.array([
+        infos.get(t, {}).get('floatShares', infos.get(t, {}).get('sharesOutstanding', 0)) or 0 for t in tickers
+    ], dtype=float)
+    short_shares = np.where(float_shares > 0, float_shares * short_interest / 100, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_to_cover = np.where(m['avg_volume'] > 0, short_shares / m['avg_volume'], 0)
+    
+    risk_scores = calculate_risk_scores(
+        short_interest,
+        m['daily_change'],
+        m['volume_ratio'],
+        days_to_cover,
+        float_shares
+    )
+    
+    results = []
+    for i, stock in enumerate(stocks):
+        ticker = stock['ticker']
+        info = infos.get(ticker, {})
+        
+        try:
+            current_price = m['current_price'][i]
+            
+            results.append({
+                'ticker': ticker,
+                'company': stock['company'],
+                'shortInterest': stock['short_interest'],
+                'previousClose': float(m['previous_close'][i]),
+                'currentPrice': float(current_price),
+                'dailyChange': float(m['daily_change'][i]),
+                'volume': int(m['current_volume'][i]),
+                'avgVolume': int(m['avg_volume'][i]),
+                'volumeRatio': float(m['volume_ratio'][i]),
+                'floatShares': int(float_shares[i]),
+                'marketCap': int(info.get('marketCap', 0) or 0),
+                'daysToCover': float(days_to_cover[i]),
+                'weekHigh52': float(info.get('fiftyTwoWeekHigh', current_price) or current_price),
+                'weekLow52': float(info.get('fiftyTwoWeekLow', current_price) or current_price),
+                'riskScore': float(risk_scores[i])
+            })
+            
+        except Exception as e:
+            print(f"Error on {ticker}: {e}")
+            continue
+    
+    return results
+
+def run_squeeze_scan(min_gain=None, min_vol_ratio=None):
+    """
+    Score squeeze candidates from the whole CSV
+    Only stocks passing the gain/volume prefilter get full history and
+    fundamentals; request thresholds are applied to the scored list later.
+    """
+    if min_gain is None:
+        min_gain = SQUEEZE_PREFILTER_MIN_GAIN
+    if min_vol_ratio is None:
+        min_vol_ratio = SQUEEZE_PREFILTER_MIN_VOL_RATIO
+    
+    stocks = load_stock_data()
+    results = []
+    passed = 0
+    
+    print(f"\n🔍 Short Squeeze Scan - {len(stocks)} stocks...")
+    
+    for chunk in scan_chunks(stocks):
+        candidates = squeeze_prefilter(chunk, min_gain, min_vol_ratio)
+        passed += len(candidates)
+        if not candidates:
+            continue
+        for result in score_squeeze_candidates(candidates):
+            results.append(result)
+            emit_scan_event('match', result=result)
+    
+    print(f"   {passed} passed the prefilter (gain >= {min_gain}%, volume >= {min_vol_ratio}x)")
+    
+    results.sort(key=lambda x: x['riskScore'], reverse=True)
+    
+    print(f"✅ Scored {len(results)} squeeze candidates\n")
+    
+    return results
+
+def run_daily_plays_scan():
+    """Daily plays scanner - KEEP FULL LIST (47 stocks)"""
+    results = []
+    total = len(DAILY_PLAYS_TICKERS)
+    
+    print(f"\n🎯 Daily Plays scan - {total} stocks...")
+    
+    position = {ticker: i for i, ticker in enumerate(DAILY_PLAYS_TICKERS, 1)}
+    for chunk in scan_chunks(DAILY_PLAYS_TICKERS):
+        bars = timeframe_bars(chunk, ['daily'])['daily']
+        matches = set(strat_matches(bars, '3-1'))
+        infos = get_infos([t for t in chunk if t in matches])
+        
+        for ticker in chunk:
+            if ticker not in matches:
+                continue
+            try:
+                hist = bars[ticker]
+                info = infos.get(ticker, {})
+                pattern_data = strat_31_pattern_data(hist)
+                
+                current_price = hist['Close'].iloc[-1]
+                previous_close = hist['Close'].iloc[-2]
+                daily_change = ((current_price - previous_close) / previous_close) * 100
+                
+                result = {
+                    'ticker': ticker,
+                    'company': info.get('longName', ticker),
+                    'currentPrice': float(current_price),
+                    'dailyChange': float(daily_change),
+                    'volume': int(hist['Volume'].iloc[-1]),
+                    'avgVolume': int(hist['Volume'].iloc[:-1].tail(VOLUME_BASELINE_WINDOW).mean()),
+                    'marketCap': info.get('marketCap', 0),
+                    'pattern': pattern_data,
+                    'timeframe': 'daily'
+                }
+                results.append(result)
+                emit_scan_event('match', result=result)
+                
+                print(f"✅ {ticker}: {pattern_data['direction']} ({position[ticker]}/{total})")
+                
+            except Exception as e:
+                print(f"❌ {ticker}: {e}")
+                continue
+    
+    print(f"✅ Found {len(results)} daily patterns\n")
+    
+    return results
+
+def run_weekly_plays_scan():
+    """Weekly plays scanner - COMBINED DAILY + VOLEMON LIST"""
+    results = []
+    
+    print(f"\n📅 Weekly Plays scan - {len(WEEKLY_HOURLY_TICKERS)} stocks...")
+    
+    for chunk in scan_chunks(WEEKLY_HOURLY_TICKERS):
+        frames = timeframe_bars(chunk, ['daily', 'weekly'])
+        bars, weekly_bars = frames['daily'], frames['weekly']
+        matches = set(strat_matches(weekly_bars, '3-1'))
         
-        stocks = load_stock_data()  # Already limited to top 30
-        results = []
+        for ticker in chunk:
+            if ticker not in matches:
+                continue
+            try:
+                hist = bars[ticker]
+                current_price = hist['Close'].iloc[-1]
+                result = {
+                    'ticker': ticker,
+                    'company': ticker,
+                    'currentPrice': float(current_price),
+                    'volume': int(hist['Volume'].iloc[-1]),
+                    'pattern': strat_31_pattern_data(weekly_bars[ticker]),
+                    'timeframe': 'weekly'
+                }
+                results.append(result)
+                emit_scan_event('match', result=result)
+                print(f"✅ {ticker}")
+            except:
+                continue
+    
+    print(f"✅ Found {len(results)} weekly patterns\n")
+    
+    return results
+
+def run_hourly_plays_scan():
+    """Hourly plays scanner - COMBINED DAILY + VOLEMON LIST"""
+    results = []
+    
+    print(f"\n⏰ Hourly Plays scan - {len(WEEKLY_HOURLY_TICKERS)} stocks...")
+    
+    for chunk in scan_chunks(WEEKLY_HOURLY_TICKERS):
+        bars = timeframe_bars(chunk, ['hourly'])['hourly']
+        matches = set(strat_matches(bars, '3-1'))
         
-        print(f"\n🔍 Short Squeeze Scan - Top {len(stocks)} stocks...")
+        for ticker in chunk:
+            if ticker not in matches:
+                continue
+            try:
+                hist = bars[ticker]
+                current_price = hist['Close'].iloc[-1]
+                result = {
+                    'ticker': ticker,
+                    'company': ticker,
+                    'currentPrice': float(current_price),
+                    'volume': int(hist['Volume'].iloc[-1]),
+                    'pattern': strat_31_pattern_data(hist),
+                    'timeframe': 'hourly'
+                }
+                results.append(result)
+                emit_scan_event('match', result=result)
+                print(f"✅ {ticker}")
+            except:
+                continue
+    
+    print(f"✅ Found {len(results)} hourly patterns\n")
+    
+    return results
+
+def run_crypto_scan():
+    """Crypto scanner - KEEP FULL LIST (5 cryptos)"""
+    results = []
+    
+    print(f"\n₿ Crypto scan - {len(CRYPTO_TICKERS)} cryptos...")
+    
+    for chunk in scan_chunks(list(CRYPTO_TICKERS)):
+        bars = timeframe_bars(chunk, ['daily'])['daily']
+        matches = set(strat_matches(bars, '3-1'))
         
-        for stock in stocks:
-            ticker = stock['ticker']
-            
+        for ticker in chunk:
+            if ticker not in matches:
+                continue
+            name = CRYPTO_TICKERS[ticker]
             try:
-                time.sleep(0.7)  # Rate limiting
+                hist = bars[ticker]
+                current_price = hist['Close'].iloc[-1]
+                prev_price = hist['Close'].iloc[-2]
+                change = ((current_price - prev_price) / prev_price) * 100
                 
-                stock_data = yf.Ticker(ticker)
-                hist = stock_data.history(period='3mo')
-                info = stock_data.info
+                result = {
+                    'ticker': ticker.replace('-USD', ''),
+                    'company': name,
+                    'currentPrice': float(current_price),
+                    'change': float(change),
+                    'volume': int(hist['Volume'].iloc[-1]),
+                    'pattern': strat_31_pattern_data(hist),
+                    'timeframe': 'daily'
+                }
+                results.append(result)
+                emit_scan_event('match', result=result)
+                print(f"✅ {name}")
+            except:
+                continue
+    
+    print(f"✅ Found {len(results)} crypto patterns\n")
+    
+    return results
+
+def run_volemon_scan():
+    """
+    Volemon volume scanner - KEEP FULL LIST (33 stocks), every ticker's volume multiple
+    The multiple is against the 20-day average, or during the session against
+    the volume usually traded by this time of day.
+    """
+    results = []
+    session_open = is_market_open(datetime.now(MARKET_TZ))
+    
+    print(f"\n🔊 Volemon scan - {len(VOLEMON_TICKERS)} stocks...")
+    
+    for chunk in scan_chunks(VOLEMON_TICKERS):
+        # The shared daily base download, plenty for the longest volume window
+        bars, infos = fetch_watchlist(chunk, DAILY_BASE_PERIOD)
+        
+        # Mid-session, judge volume against the same time of day rather than whole days
+        relative = {}
+        if session_open:
+            try:
+                relative = intraday_relative_volume(
+                    fetch_history_batch(chunk, INTRADAY_RVOL_PERIOD, INTRADAY_RVOL_INTERVAL)
+                )
+            except Exception as e:
+                print(f"⚠️  Intraday relative volume unavailable: {e}")
+        
+        for ticker in chunk:
+            try:
+                hist = bars.get(ticker)
+                info = infos.get(ticker, {})
                 
-                if len(hist) >= 2:
-                    current_price = hist['Close'].iloc[-1]
-                    previous_close = hist['Close'].iloc[-2]
-                    daily_change = ((current_price - previous_close) / previous_close) * 100
+                if hist is not None and len(hist) >= 2:
+                    state, changed = volemon_state.update(ticker, hist)
+                    if not changed:
+                        if state['result'] is not None:
+                            results.append(state['result'])
+                            emit_scan_event('match', result=state['result'])
+                        continue
                     
                     current_volume = hist['Volume'].iloc[-1]
-                    avg_volume = hist['Volume'].iloc[-21:-1].mean() if len(hist) > 20 else hist['Volume'].mean()
-                    volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1.0
+                    avg_volume = volemon_state.average_volume(state)
+                    state['result'] = None
                     
-                    float_shares = info.get('floatShares', info.get('sharesOutstanding', 0))
-                    market_cap = info.get('marketCap', 0)
-                    week_high_52 = info.get('fiftyTwoWeekHigh', current_price)
-                    week_low_52 = info.get('fiftyTwoWeekLow', current_price)
-                    
-                    short_shares = (float_shares * stock['short_interest'] / 100) if float_shares > 0 else 0
-                    days_to_cover = short_shares / avg_volume if avg_volume > 0 else 0
-                    
-                    risk_score = calculate_risk_score(
-                        stock['short_interest'],
-                        daily_change,
-                        volume_ratio,
-                        days_to_cover,
-                        float_shares
-                    )
-                    
-                    if (stock['short_interest'] >= min_short and 
-                        daily_change >= min_gain and 
-                        volume_ratio >= min_vol_ratio and
-                        risk_score >= min_risk):
+                    if avg_volume > 0:
+                        daily_multiple = current_volume / avg_volume
+                        volume_multiple = relative.get(ticker, daily_multiple)
+                        current_price = hist['Close'].iloc[-1]
+                        prev_price = hist['Close'].iloc[-2]
+                        change = ((current_price - prev_price) / prev_price) * 100
                         
-                        results.append({
+                        result = {
                             'ticker': ticker,
-                            'company': stock['company'],
-                            'shortInterest': stock['short_interest'],
-                            'previousClose': float(previous_close),
-                            'currentPrice': float(current_price),
-                            'dailyChange': float(daily_change),
+                            'company': info.get('longName', ticker),
+                            'price': float(current_price),
+                            'change': float(change),
                             'volume': int(current_volume),
-                            'avgVolume': int(avg_volume),
-                            'volumeRatio': float(volume_ratio),
-                            'floatShares': int(float_shares),
-                            'marketCap': int(market_cap),
-                            'daysToCover': float(days_to_cover),
-                            'weekHigh52': float(week_high_52),
-                            'weekLow52': float(week_low_52),
-                            'riskScore': float(risk_score)
-                        })
+                            'avg_volume': int(avg_volume),
+                            'volume_multiple': float(volume_multiple),
+                            'daily_volume_multiple': float(daily_multiple),
+                            'relative_volume': relative.get(ticker),
+                            'volume_ratios': {
+                                f'{w}d': float(current_volume / volemon_state.average_volume(state, w))
+                                for w in VOLUME_WINDOWS if volemon_state.average_volume(state, w) > 0
+                            },
+                            'market_cap': info.get('marketCap', 0)
+                        }
+                        state['result'] = result
+                        results.append(result)
+                        emit_scan_event('match', result=result)
+            except:
+                continue
+    
+    results.sort(key=lambda x: x['volume_multiple'], reverse=True)
+    
+    print(f"✅ Measured {len(results)} ({volemon_state.stats()['reused']} unchanged so far)\n")
+    
+    return results
+
+def run_usuals_scan(tickers):
+    """Usuals watchlist scanner - KEEP FULL LIST (14 stocks default)"""
+    results = []
+    
+    print(f"\n⭐ Usuals scan - {len(tickers)} stocks...")
+    
+    for chunk in scan_chunks(tickers):
+        # Warm the bar and fundamentals caches a chunk at a time so safe_yf_ticker hits them
+        bars, _ = fetch_watchlist(chunk, DAILY_BASE_PERIOD)
+        
+        # Quote every ticker that will fall back to Tradier in one request
+        missing = [t for t in chunk if t not in bars or len(bars[t]) < 2]
+        if missing and TRADIER_API_KEY:
+            tradier_quotes.get_many(missing)
+        
+        fetched = {}
+        for ticker in chunk:
+            try:
+                stock_data, hist, info = safe_yf_ticker(ticker)
+                # Two rows are enough for price and change; Tradier fallback rows have no more
+                if stock_data and hist is not None and len(hist) >= 2:
+                    fetched[ticker] = (hist, info)
+            except Exception as e:
+                print(f"⚠️  {ticker}: {e}")
+        if not fetched:
+            continue
+        
+        # Tickers whose latest bar is unchanged keep their previous result
+        states = {}
+        for ticker, (hist, info) in fetched.items():
+            if isinstance(hist.index, pd.DatetimeIndex):
+                states[ticker], _ = usuals_state.update(ticker, hist)
+        symbols = [t for t in fetched if t not in states or 'result' not in states[t]]
+        
+        # Classify the last bars of every changed ticker in one pass; fallback quotes have no bars to classify
+        with timed_stage('patterns'):
+            bar_symbols = [t for t in symbols if t in states]
+            frames = {t: fetched[t][0] for t in bar_symbols}
+            last_bars = stack_bars(frames, bar_symbols, length=3)
+            codes = classify_bars(last_bars['High'], last_bars['Low'])
+            is_31 = detect_patterns(codes, ['3-1'])['3-1'][:, -1]
+            is_inside = codes[:, -1] == BAR_INSIDE
+            is_green = last_bars['Close'][:, -1] > last_bars['Open'][:, -1]
+        row = {ticker: i for i, ticker in enumerate(bar_symbols)}
+        
+        for ticker in fetched:
+            if ticker in states and 'result' in states[ticker]:
+                results.append(states[ticker]['result'])
+                emit_scan_event('match', result=states[ticker]['result'])
+                continue
+            i = row.get(ticker)
+            try:
+                hist, info = fetched[ticker]
+                current_price = hist['Close'].iloc[-1]
+                prev_price = hist['Close'].iloc[-2]
+                change = ((current_price - prev_price) / prev_price) * 100
+                
+                current_volume = hist['Volume'].iloc[-1]
+                if ticker in states:
+                    avg_volume = usuals_state.average_volume(states[ticker])
+                else:
+                    # Tradier fallback rows (reachable now that two rows are enough) have no bar
+                    # history to roll forward; both rows carry the quote's average volume
+                    avg_volume = hist['Volume'].iloc[:-1].mean()
+                volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
+                
+                # Check patterns
+                patterns = {}
+                if i is not None and is_31[i]:
+                    patterns['daily'] = {
+                        'type': '3-1 Strat',
+                        'direction': 'bullish' if is_green[i] else 'bearish'
+                    }
+                elif i is not None and is_inside[i]:
+                    patterns['daily'] = {
+                        'type': 'Inside Bar (1)',
+                        'direction': 'neutral'
+                    }
+                
+                result = {
+                    'ticker': ticker,
+                    'company': info.get('longName', ticker),
+                    'price': float(current_price),
+                    'change': float(change),
+                    'volume': int(current_volume),
+                    'avg_volume': int(avg_volume),
+                    'volume_ratio': float(volume_ratio),
+                    'patterns': patterns
+                }
+                if ticker in states:
+                    states[ticker]['result'] = result
+                results.append(result)
+                emit_scan_event('match', result=result)
+                
+                print(f"✅ {ticker}")
                 
             except Exception as e:
-                print(f"Error on {ticker}: {e}")
+                print(f"⚠️  {ticker}: {e}")
                 continue
         
-        results.sort(key=lambda x: x['riskScore'], reverse=True)
+    print(f"✅ Done! {len(results)} stocks\n")
+    
+    return results
+
+CONTINUITY_TIMEFRAMES = ('hourly', '4h', 'daily', 'weekly', 'monthly')
+
+def bar_color(open_, close):
+    """'green', 'red' or None (no bar / unchanged) for each current bar"""
+    return np.select([close > open_, close < open_], ['green', 'red'], default=None)
+
+@timed('patterns')
+def classify_timeframes(frames, tickers, timeframes):
+    """
+    Current Strat bar, color and completed patterns per ticker and timeframe:
+    {ticker: {timeframe: {...}}}, one classification pass per timeframe
+    """
+    longest = max(len(spec) for spec in STRAT_PATTERNS.values()) + 1
+    per_ticker = {ticker: {} for ticker in tickers}
+    for timeframe in timeframes:
+        bars = frames[timeframe]
+        symbols = [t for t in tickers if bars.get(t) is not None and len(bars[t])]
+        if not symbols:
+            continue
+        last_bars = stack_bars(bars, symbols, length=longest)
+        codes = classify_bars(last_bars['High'], last_bars['Low'])
+        hits = {name: hit[:, -1] for name, hit in detect_patterns(codes).items()}
+        colors = bar_color(last_bars['Open'][:, -1], last_bars['Close'][:, -1])
+        for i, ticker in enumerate(symbols):
+            per_ticker[ticker][timeframe] = {
+                'bar': BAR_LABELS[int(codes[i, -1])],
+                'color': colors[i],
+                'patterns': [name for name, hit in hits.items() if hit[i]],
+                'open': float(last_bars['Open'][i, -1]),
+                'close': float(last_bars['Close'][i, -1]),
+                'date': bars[ticker].index[-1].isoformat()
+            }
+    return per_ticker
+
+def timeframe_continuity(found, timeframes):
+    """'green' or 'red' when every timeframe's current bar agrees, else None"""
+    colors = {found[tf]['color'] for tf in timeframes if tf in found}
+    return colors.pop() if len(found) == len(timeframes) and len(colors) == 1 else None
+
+def run_continuity_scan(tickers, timeframes=CONTINUITY_TIMEFRAMES):
+    """
+    Strat bar types and patterns on every timeframe for a watchlist
+    Bars come from timeframe_bars, so all timeframes cost one daily and one
+    hourly download; `continuity` is 'green' or 'red' when every timeframe's
+    current bar agrees, else None.
+    """
+    results = []
+    
+    print(f"\n🧭 Continuity scan - {len(tickers)} stocks, {', '.join(timeframes)}...")
+    
+    for chunk in scan_chunks(tickers):
+        per_ticker = classify_timeframes(timeframe_bars(chunk, timeframes), chunk, timeframes)
         
-        print(f"✅ Found {len(results)} squeeze candidates\n")
+        for ticker in chunk:
+            found = per_ticker[ticker]
+            if not found:
+                print(f"⚠️  {ticker}: no bars")
+                continue
+            continuity = timeframe_continuity(found, timeframes)
+            latest = found.get('hourly') or found.get('daily') or next(iter(found.values()))
+            result = {
+                'ticker': ticker,
+                'price': latest['close'],
+                'continuity': continuity,
+                'timeframes': found,
+                'patterns': {tf: found[tf]['patterns'] for tf in found if found[tf]['patterns']}
+            }
+            results.append(result)
+            emit_scan_event('match', result=result)
+            print(f"✅ {ticker} {continuity or 'mixed'}")
+    
+    print(f"✅ Done! {sum(1 for r in results if r['continuity'])} of {len(results)} in full continuity\n")
+    
+    return results
+
+def universe_tickers():
+    """Every ticker any scanner watches, plus short interest for the squeeze list"""
+    short = {s['ticker']: s for s in load_stock_data()}
+    tickers = list(dict.fromkeys(DAILY_PLAYS_TICKERS + DEFAULT_USUALS + list(short)))
+    return tickers, short
+
+def optional_float(value):
+    """float(value), or None for missing and NaN values (which JSON cannot carry)"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnan(value) else value
+
+def run_universe_scan():
+    """
+    Latest metrics for the whole universe, one flat row per ticker
+    Feeds the screen index: price and volume, squeeze inputs and score
+    (where short interest is known) and the Strat bar on every timeframe.
+    """
+    tickers, short = universe_tickers()
+    results = []
+    
+    print(f"\n🌐 Universe snapshot - {len(tickers)} stocks...")
+    
+    for chunk in scan_chunks(tickers):
+        infos = {}
+        info_thread = threading.Thread(target=lambda: infos.update(get_infos(chunk)), daemon=True, name='universe-info')
+        info_thread.start()
+        frames = timeframe_bars(chunk, CONTINUITY_TIMEFRAMES)
+        info_thread.join()
+        
+        daily = frames['daily']
+        symbols = [t for t in chunk if daily.get(t) is not None and len(daily[t]) >= 2]
+        if not symbols:
+            continue
+        per_ticker = classify_timeframes(frames, symbols, CONTINUITY_TIMEFRAMES)
+        
+        # Squeeze inputs and scores for the whole chunk at once; NaN where short interest is unknown
+        window = stack_bars(daily, symbols, length=VOLUME_BASELINE_WINDOW + 1, fields=('Close', 'Volume'))
+        m = squeeze_metrics(window['Close'], window['Volume'])
+        short_interest = np.array([short[t]['short_interest'] if t in short else np.nan for t in symbols])
+        float_shares = np.array([
+            infos.get(t, {}).get('floatShares', infos.get(t, {}).get('sharesOutstanding', 0)) or 0 for t in symbols
+        ], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            days_to_cover = np.where(m['avg_volume'] > 0, float_shares * short_interest / 100 / m['avg_volume'], np.nan)
+        risk_scores = calculate_risk_scores(short_interest, m['daily_change'], m['volume_ratio'], days_to_cover, float_shares)
+        
+        for i, ticker in enumerate(symbols):
+            info = infos.get(ticker, {})
+            found = per_ticker[ticker]
+            row = {
+                'ticker': ticker,
+                'company': short[ticker]['company'] if ticker in short else info.get('longName', ticker),
+                'price': optional_float(m['current_price'][i]),
+                'change': optional_float(m['daily_change'][i]),
+                'volume': optional_float(m['current_volume'][i]),
+                'avg_volume': optional_float(m['avg_volume'][i]),
+                'volume_ratio': optional_float(m['volume_ratio'][i]),
+                'short_interest': optional_float(short_interest[i]),
+                'days_to_cover': optional_float(days_to_cover[i]),
+                'float_shares': optional_float(float_shares[i]),
+                'market_cap': optional_float(info.get('marketCap')),
+                'risk_score': optional_float(risk_scores[i]),
+                'continuity': timeframe_continuity(found, CONTINUITY_TIMEFRAMES)
+            }
+            for timeframe in CONTINUITY_TIMEFRAMES:
+                row[f'bar_{timeframe}'] = found[timeframe]['bar'] if timeframe in found else None
+            results.append(row)
+            emit_scan_event('match', result=row)
+    
+    print(f"✅ Snapshot of {len(results)} stocks\n")
+
+    return results
+
+# ===== BACKTEST =====
+# 3-1 win rates replayed over every stored bar, scored with the rule the
+# page used to apply one pattern at a time: 7 days after the 1 bar closes,
+# a 3% move its way (green bar bullish, red bearish) is a win, under 3%
+# either way is neutral and anything else is a loss.
+
+BACKTEST_TIMEFRAMES = CONTINUITY_TIMEFRAMES
+BACKTEST_HOLD_DAYS = 7
+BACKTEST_WIN_PERCENT = 3.0
+
+def bar_close_times(base, bars, rule):
+    """When each bar closed, as the int64 (UTC ns) time of the last base bar inside it"""
+    labels = bars.index.asi8
+    if rule is None:
+        return labels
+    base_times = base.index.asi8
+    if pd.Grouper(freq=rule).closed == 'right':
+        # Labelled by their last instant (weekly): everything up to and including the label
+        last = np.searchsorted(base_times, labels, side='right') - 1
+    else:
+        # Labelled by their start: everything before the next bar's label
+        last = np.searchsorted(base_times, np.append(labels[1:], np.iinfo(np.int64).max), side='left') - 1
+    return base_times[last]
+
+@timed('backtest')
+def backtest_timeframe(bars, bases, rule, tickers):
+    """
+    Win-rate rows for one timeframe: {ticker: {...}} for tickers with at least one 3-1
+    Patterns are found for every bar of every ticker in one pass; each one's
+    exit is the last base close within BACKTEST_HOLD_DAYS of its 1 bar closing.
+    """
+    symbols = [t for t in tickers if bars.get(t) is not None and len(bars[t]) >= 3 and t in bases]
+    if not symbols:
+        return {}
+    stacked = stack_bars(bars, symbols)
+    hits = detect_patterns(classify_bars(stacked['High'], stacked['Low']), ['3-1'])['3-1']
+    width = hits.shape[1]
+    hold = BACKTEST_HOLD_DAYS * 86400 * 10**9
+
+    rows = {}
+    for i, ticker in enumerate(symbols):
+        columns = np.flatnonzero(hits[i])
+        if not len(columns):
+            continue
+        frame, base = bars[ticker], bases[ticker]
+        base_times = base.index.asi8
+        targets = bar_close_times(base, frame, rule)[columns - (width - len(frame))] + hold
+        exits = base['Close'].to_numpy(dtype=float)[np.searchsorted(base_times, targets, side='right') - 1]
+        entries = stacked['Close'][i, columns]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (exits - entries) / entries * 100
+        returns = np.where(stacked['Close'][i, columns] > stacked['Open'][i, columns], change, -change)
+        pending = targets > base_times[-1]
+        outcomes = np.select(
+            [pending, returns >= BACKTEST_WIN_PERCENT, np.abs(change) < BACKTEST_WIN_PERCENT],
+            ['pending', 'win', 'neutral'],
+            default='loss'
+        )
+
+        wins, losses, neutral = (int((outcomes == o).sum()) for o in ('win', 'loss', 'neutral'))
+        resolved = wins + losses + neutral
+        rows[ticker] = {
+            'patterns': len(columns),
+            'wins': wins,
+            'losses': losses,
+            'neutral': neutral,
+            'pending': int(pending.sum()),
+            'winRate': round(wins / resolved * 100, 1) if resolved else None,
+            'avgReturn': optional_float(round(float(np.nanmean(returns[~pending])), 2)) if resolved else None,
+            'lastPattern': frame.index[columns[-1] - (width - len(frame))].isoformat()
+        }
+    return rows
+
+def run_backtest(tickers=None):
+    """
+    3-1 win rates for every universe and crypto ticker on every Strat
+    timeframe, one row per (ticker, timeframe) with at least one pattern
+    """
+    if tickers is None:
+        tickers = list(dict.fromkeys(universe_tickers()[0] + list(CRYPTO_TICKERS)))
+    results = []
+
+    print(f"\n🧪 Backtesting 3-1 win rates - {len(tickers)} stocks, {', '.join(BACKTEST_TIMEFRAMES)}...")
+
+    for chunk in scan_chunks(tickers):
+        frames = timeframe_bars(chunk, BACKTEST_TIMEFRAMES)
+        for timeframe in BACKTEST_TIMEFRAMES:
+            interval, period, rule = TIMEFRAMES[timeframe]
+            # Cache hits: timeframe_bars just fetched these base bars
+            bases = fetch_history_batch(chunk, period, interval)
+            for ticker, row in backtest_timeframe(frames[timeframe], bases, rule, chunk).items():
+                results.append({'ticker': ticker, 'timeframe': timeframe, **row})
+
+    print(f"✅ Backtested {sum(r['patterns'] for r in results)} patterns across {len(results)} ticker timeframes\n")
+
+    return results
+
+class WinRateTable:
+    """The stored backtest keyed by ticker then timeframe, rebuilt when a newer one lands"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.computed_at = None
+        self.by_ticker = {}
+
+    def refresh(self, entry):
+        with self._lock:
+            if entry['computed_at'] != self.computed_at:
+                by_ticker = {}
+                for row in entry['results']:
+                    by_ticker.setdefault(row['ticker'], {})[row['timeframe']] = row
+                self.by_ticker, self.computed_at = by_ticker, entry['computed_at']
+            return self.by_ticker
+
+    def lookup(self, entry, tickers=None, timeframes=None):
+        """{ticker: {timeframe: row}}, limited to `tickers` and `timeframes` when given"""
+        by_ticker = self.refresh(entry)
+        selected = by_ticker if tickers is None else {t: by_ticker[t] for t in tickers if t in by_ticker}
+        if timeframes is None:
+            return selected
+        return {
+            ticker: {tf: rows[tf] for tf in timeframes if tf in rows}
+            for ticker, rows in selected.items()
+            if any(tf in rows for tf in timeframes)
+        }
+
+    def stats(self):
+        with self._lock:
+            return {'tickers': len(self.by_ticker), 'computedAt': self.computed_at}
+
+win_rate_table = WinRateTable()
+
+# ===== BACKGROUND SCAN SCHEDULER =====
+# Scanners run on their own cadence in one background thread and the
+# endpoints answer from the latest stored result, so N users cost one scan.
+
+SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', '1') == '1'
+SQUEEZE_INTERVAL_MINUTES = int(os.environ.get('SQUEEZE_INTERVAL_MINUTES', 15))
+VOLEMON_INTERVAL_MINUTES = int(os.environ.get('VOLEMON_INTERVAL_MINUTES', 20))
+USUALS_INTERVAL_MINUTES = int(os.environ.get('USUALS_INTERVAL_MINUTES', 20))
+UNIVERSE_INTERVAL_MINUTES = int(os.environ.get('UNIVERSE_INTERVAL_MINUTES', 15))
+STALE_GRACE_SECONDS = 300  # How late a scheduled run may be before requests rescan themselves
+SCHEDULER_LEASE_SECONDS = 120  # Other workers take over scheduling if the leader goes quiet this long
+SCAN_LEASE_SECONDS = 900  # Longest a worker may hold a scan before others give up waiting on it
+
+def every_minutes(minutes):
+    """Cadence aligned to wall-clock multiples of `minutes`"""
+    step = minutes * 60
+    def next_run(after):
+        return datetime.fromtimestamp((after.timestamp() // step + 1) * step, MARKET_TZ)
+    return next_run
+
+def on_the_hour(after):
+    """A minute past each hour, once the hourly bar has closed"""
+    candidate = after.replace(minute=1, second=0, microsecond=0)
+    if candidate <= after:
+        candidate += timedelta(hours=1)
+    return candidate
+
+def after_close(after):
+    """16:15 ET on the next weekday, once the daily bar is final"""
+    candidate = after.replace(hour=16, minute=15, second=0, microsecond=0)
+    if candidate <= after:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+class ScanJob:
+    """A scanner plus the cadence it should run on"""
+
+    def __init__(self, name, func, cadence):
+        self.name = name
+        self.func = func
+        self.cadence = cadence
+
+SCAN_JOBS = {
+    'squeeze': ScanJob('squeeze', run_squeeze_scan, every_minutes(SQUEEZE_INTERVAL_MINUTES)),
+    'daily': ScanJob('daily', run_daily_plays_scan, after_close),
+    'weekly': ScanJob('weekly', run_weekly_plays_scan, after_close),
+    'hourly': ScanJob('hourly', run_hourly_plays_scan, on_the_hour),
+    'crypto': ScanJob('crypto', run_crypto_scan, on_the_hour),
+    'volemon': ScanJob('volemon', run_volemon_scan, every_minutes(VOLEMON_INTERVAL_MINUTES)),
+    'usuals': ScanJob('usuals', lambda: run_usuals_scan(DEFAULT_USUALS), every_minutes(USUALS_INTERVAL_MINUTES)),
+    'continuity': ScanJob('continuity', lambda: run_continuity_scan(DEFAULT_USUALS), on_the_hour),
+    'universe': ScanJob('universe', run_universe_scan, every_minutes(UNIVERSE_INTERVAL_MINUTES)),
+    'backtest': ScanJob('backtest', run_backtest, after_close),
+}
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> {'done': Event, 'result': ..., 'error': ...}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {'done': threading.Event(), 'result': None, 'error': None}
+                self._calls[key] = call
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = func()
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+        return call['result']
+
+scan_flight = SingleFlight()
+
+scan_results = {}  # key -> {'results': [...], 'computed_at': epoch seconds}
+scan_results_lock = threading.Lock()
+
+def store_scan_result(key, results, timing=None):
+    with scan_results_lock:
+        previous = scan_results.get(key)
+        scan_results[key] = {'results': results, 'computed_at': time.time(), 'timing': timing}
+        if previous is not None:
+            # One generation back, so clients can fetch just what changed
+            scan_results[key]['previous'] = {'results': previous['results'], 'computed_at': previous['computed_at']}
+        entry = scan_results[key]
+    if shared_cache is not None:
+        try:
+            shared_cache.put_scan(key, entry)
+        except Exception as e:
+            print(f"⚠️  Shared cache write failed for {key}: {e}")
+    return entry
+
+def load_scan_result(key):
+    """Latest result for a key, from this worker or, if newer, from the shared cache"""
+    with scan_results_lock:
+        entry = scan_results.get(key)
+    if shared_cache is not None:
+        try:
+            # The timestamp is compared in SQL, so an unchanged result is never read or parsed
+            shared = shared_cache.get_scan(key, newer_than=entry and entry['computed_at'])
+        except Exception as e:
+            print(f"⚠️  Shared cache read failed for {key}: {e}")
+            shared = None
+        if shared:
+            if entry is not None:
+                shared['previous'] = {'results': entry['results'], 'computed_at': entry['computed_at']}
+            with scan_results_lock:
+                scan_results[key] = entry = shared
+    return entry
+
+def scan_lease_name(key):
+    return 'scan:' + json.dumps(key)
+
+def wait_for_shared_scan(key, since):
+    """
+    Wait for the result of a scan another worker is running
+    Returns None once that worker let go of the lease without a result,
+    in which case this worker now holds the lease.
+    """
+    while True:
+        entry = shared_cache.get_scan(key)
+        if entry and entry['computed_at'] >= since:
+            return entry
+        if shared_cache.try_lease(scan_lease_name(key), SCAN_LEASE_SECONDS):
+            return None
+        time.sleep(1)
+
+def is_scan_fresh(entry, cadence):
+    """Fresh until the next scheduled run after it was computed (plus a grace period)"""
+    computed = datetime.fromtimestamp(entry['computed_at'], MARKET_TZ)
+    due = cadence(computed).timestamp() + STALE_GRACE_SECONDS
+    return time.time() < due
+
+def run_scan(key, func):
+    """Run a scan and store it; concurrent callers for the same key share one run"""
+    def execute():
+        scan_events.begin(key)
+        scan_context.key = key
+        leased = False
+        try:
+            if shared_cache is not None:
+                leased = shared_cache.try_lease(scan_lease_name(key), SCAN_LEASE_SECONDS)
+                if not leased:
+                    # Another worker is running this scan; share its result
+                    print(f"⏳ {key} scan running in another worker, waiting for it...")
+                    entry = wait_for_shared_scan(key, time.time())
+                    leased = entry is None
+                    if entry is not None:
+                        with scan_results_lock:
+                            scan_results[key] = entry
+                        for result in entry['results']:
+                            emit_scan_event('match', result=result)
+                        scan_events.publish(key, {'type': 'done', 'computedAt': entry['computed_at']})
+                        return entry
+            started = time.perf_counter()
+            with collect_timings() as breakdown:
+                results = func()
+            elapsed = time.perf_counter() - started
+            metrics.observe('lemon_scan_seconds', elapsed, job=key if isinstance(key, str) else key[0])
+            entry = store_scan_result(key, results, {'seconds': round(elapsed, 4), 'stages': rounded_timings(breakdown)})
+            scan_events.publish(key, {'type': 'done', 'computedAt': entry['computed_at']})
+            return entry
+        except Exception as e:
+            scan_events.publish(key, {'type': 'error', 'error': str(e)})
+            raise
+        finally:
+            if leased:
+                shared_cache.release(scan_lease_name(key))
+            scan_context.key = None
+            scan_events.end(key)
+    return scan_flight.do(key, execute)
+
+def get_scan_result(job_name, key=None, func=None):
+    """
+    Latest stored result for a scanner, rescanning inline only when there
+    is none or the scheduler has fallen behind
+    """
+    ensure_scheduler_started()
+    job = SCAN_JOBS[job_name]
+    key = key or job_name
+    entry = load_scan_result(key)
+    if entry is None or not is_scan_fresh(entry, job.cadence):
+        entry = run_scan(key, func or job.func)
+    return entry
+
+class ScanScheduler(threading.Thread):
+    """
+    Runs every ScanJob once at startup, then on its cadence
+    With the shared cache, only the worker holding the scheduler lease runs
+    jobs; the others serve its results and take over if it goes quiet.
+    """
+
+    def __init__(self, jobs):
+        super().__init__(daemon=True, name='scan-scheduler')
+        self.jobs = jobs
+        self.next_runs = {}
+        self.leader = shared_cache is None
+
+    def is_leader(self):
+        if shared_cache is not None:
+            try:
+                self.leader = shared_cache.try_lease('scheduler', SCHEDULER_LEASE_SECONDS)
+            except Exception as e:
+                print(f"⚠️  Scheduler lease check failed: {e}")
+                self.leader = False
+        return self.leader
+
+    def run(self):
+        print(f"🕒 Scan scheduler started ({len(self.jobs)} jobs)")
+        now = datetime.now(MARKET_TZ)
+        for job in self.jobs.values():
+            self.next_runs[job.name] = now
+
+        while True:
+            if not self.is_leader():
+                time.sleep(SCHEDULER_LEASE_SECONDS / 4)
+                continue
+            now = datetime.now(MARKET_TZ)
+            for job in self.jobs.values():
+                if self.next_runs[job.name] <= now:
+                    # A result another worker (or a previous leader) stored may still be current
+                    entry = load_scan_result(job.name)
+                    if entry is not None:
+                        due = job.cadence(datetime.fromtimestamp(entry['computed_at'], MARKET_TZ))
+                        if due > now:
+                            self.next_runs[job.name] = due
+                            continue
+                    try:
+                        run_scan(job.name, job.func)
+                    except Exception as e:
+                        print(f"❌ Scheduled {job.name} scan failed: {e}")
+                    self.next_runs[job.name] = job.cadence(datetime.now(MARKET_TZ))
+
+            wait = min(self.next_runs.values()) - datetime.now(MARKET_TZ)
+            time.sleep(min(max(wait.total_seconds(), 1), 30))
+
+scan_scheduler = None
+scan_scheduler_lock = threading.Lock()
+
+def ensure_scheduler_started():
+    """Start the scheduler lazily, so only processes that serve requests run it"""
+    global scan_scheduler
+    if not SCHEDULER_ENABLED or scan_scheduler is not None:
+        return
+    with scan_scheduler_lock:
+        if scan_scheduler is None:
+            scan_scheduler = ScanScheduler(SCAN_JOBS)
+            scan_scheduler.start()
+
+def scan_response(entry, results, **extra):
+    """JSON body for a stored scan result, including how old it is"""
+    body = {
+        'success': True,
+        'timestamp': datetime.fromtimestamp(entry['computed_at']).isoformat(),
+        'ageSeconds': round(time.time() - entry['computed_at'], 1),
+        'computedAt': entry['computed_at']
+    }
+    if results is not None:
+        body['results'] = results
+    body.update(extra)
+    if getattr(g, 'timings', None) is not None:
+        # ?timing=1: how the stored scan spent its time (when this worker ran it) and this request's own stages
+        body['timing'] = {
+            'scan': entry.get('timing'),
+            'request': {'seconds': round(time.perf_counter() - g.request_started, 4), 'stages': rounded_timings(g.timings)}
+        }
+    with timed_stage('serialize'):
+        return jsonify(body)
+
+def scan_delta(entry, select, since):
+    """
+    What changed since the result a client last saw (its `computedAt`):
+    {added, updated, removed}, or None when that result is no longer known.
+    `select` turns a stored result list into what the endpoint returns.
+    """
+    if since == entry['computed_at']:
+        return {'added': [], 'updated': [], 'removed': []}
+    previous = entry.get('previous')
+    if previous is None or since != previous['computed_at']:
+        return None
+    before = {r['ticker']: r for r in select(previous['results'])}
+    after = {r['ticker']: r for r in select(entry['results'])}
+    return {
+        'added': [r for t, r in after.items() if t not in before],
+        'updated': [r for t, r in after.items() if t in before and r != before[t]],
+        'removed': [t for t in before if t not in after]
+    }
+
+def delta_response(entry, select, since):
+    """Delta body when the client sent a known `since`, else the full selected list"""
+    if since is not None:
+        delta = scan_delta(entry, select, since)
+        if delta is not None:
+            return scan_response(entry, None, delta=delta)
+    return scan_response(entry, select(entry['results']))
+
+STREAM_KEEPALIVE_SECONDS = 15
+
+def sse_event(event_type, payload):
+    """One Server-Sent Events message"""
+    return f"event: {event_type}\ndata: {json.dumps(payload)}\n\n"
+
+def run_scan_in_background(key, func):
+    """Kick off (or join) a scan without blocking the caller"""
+    def target():
+        try:
+            run_scan(key, func)
+        except Exception as e:
+            print(f"❌ Streamed {key} scan failed: {e}")
+    threading.Thread(target=target, daemon=True).start()
+
+def stream_scan(job_name, key=None, func=None, keep=None):
+    """
+    Server-Sent Events for a scan: a fresh stored result is replayed at once,
+    otherwise progress and matches are sent as the live run computes them
+    """
+    ensure_scheduler_started()
+    job = SCAN_JOBS[job_name]
+    key = key or job_name
+    func = func or job.func
+    keep = keep or (lambda result: True)
+    
+    def generate():
+        # Subscribe before checking the store so no event of a new run is missed
+        events = scan_events.subscribe(key)
+        try:
+            entry = load_scan_result(key)
+            if entry is not None and is_scan_fresh(entry, job.cadence):
+                for result in entry['results']:
+                    if keep(result):
+                        yield sse_event('match', {'result': result})
+                yield sse_event('done', {
+                    'timestamp': datetime.fromtimestamp(entry['computed_at']).isoformat(),
+                    'ageSeconds': round(time.time() - entry['computed_at'], 1)
+                })
+                return
+            
+            run_scan_in_background(key, func)
+            while True:
+                try:
+                    event = events.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                
+                if event['type'] == 'match':
+                    if keep(event['result']):
+                        yield sse_event('match', {'result': event['result']})
+                elif event['type'] == 'progress':
+                    yield sse_event('progress', {'done': event['done'], 'total': event['total']})
+                elif event['type'] == 'error':
+                    yield sse_event('error', {'error': event['error']})
+                    return
+                elif event['type'] == 'done':
+                    yield sse_event('done', {
+                        'timestamp': datetime.fromtimestamp(event['computedAt']).isoformat(),
+                        'ageSeconds': round(time.time() - event['computedAt'], 1)
+                    })
+                    return
+        finally:
+            scan_events.unsubscribe(key, events)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# ===== UNIVERSE INDEX =====
+# The latest universe snapshot as one NumPy array per field, so /api/screen
+# can filter and sort every ticker with a handful of vectorized operations.
+# Expressions are parsed with `ast` and only whitelisted nodes are evaluated.
+
+SCREEN_MAX_RESULTS = 500
+SCREEN_MAX_EXPRESSION_LENGTH = 500
+
+SCREEN_FUNCTIONS = {'abs': np.abs, 'log': np.log, 'min': np.minimum, 'max': np.maximum}
+SCREEN_BINARY_OPS = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply,
+    ast.Div: np.divide, ast.Mod: np.mod, ast.Pow: np.power
+}
+SCREEN_COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+    ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge
+}
+
+class UniverseIndex:
+    """Columnar view of the stored universe scan, rebuilt when a newer one lands"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.computed_at = None
+        self.rows = []
+        self.columns = {}
+        self._expressions = OrderedDict()  # expression text -> parsed tree
+
+    def refresh(self, entry):
+        with self._lock:
+            if entry['computed_at'] != self.computed_at:
+                rows = entry['results']
+                columns = {}
+                for field in (rows[0] if rows else {}):
+                    values = [row.get(field) for row in rows]
+                    if all(v is None or isinstance(v, (int, float)) for v in values):
+                        columns[field] = np.array([np.nan if v is None else v for v in values], dtype=float)
+                    else:
+                        columns[field] = np.array(values, dtype=object)
+                self.rows, self.columns, self.computed_at = rows, columns, entry['computed_at']
+            return self.rows, self.columns
+
+    def parse(self, text):
+        """Parsed and validated expression, cached by its text"""
+        with self._lock:
+            tree = self._expressions.get(text)
+            if tree is not None:
+                self._expressions.move_to_end(text)
+                return tree
+        if len(text) > SCREEN_MAX_EXPRESSION_LENGTH:
+            raise ValueError(f"Expression longer than {SCREEN_MAX_EXPRESSION_LENGTH} characters")
+        try:
+            tree = ast.parse(text, mode='eval').body
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression: {e.msg}")
+        with self._lock:
+            self._expressions[text] = tree
+            if len(self._expressions) > 256:
+                self._expressions.popitem(last=False)
+        return tree
+
+    def evaluate(self, node, columns):
+        """Value of an expression tree over whole columns"""
+        if isinstance(node, ast.Constant) and (node.value is None or isinstance(node.value, (int, float, str))):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id not in columns:
+                raise ValueError(f"Unknown field '{node.id}'")
+            return columns[node.id]
+        if isinstance(node, ast.BoolOp):
+            values = [self.as_mask(self.evaluate(v, columns), columns) for v in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return combine.reduce(values)
+        if isinstance(node, ast.UnaryOp):
+            value = self.evaluate(node.operand, columns)
+            if isinstance(node.op, ast.Not):
+                return ~self.as_mask(value, columns)
+            if isinstance(node.op, ast.USub):
+                return -value
+            if isinstance(node.op, ast.UAdd):
+                return value
+        if isinstance(node, ast.BinOp) and type(node.op) in SCREEN_BINARY_OPS:
+            with np.errstate(all='ignore'):
+                return SCREEN_BINARY_OPS[type(node.op)](self.evaluate(node.left, columns), self.evaluate(node.right, columns))
+        if isinstance(node, ast.Compare):
+            mask, left = True, self.evaluate(node.left, columns)
+            for op, comparator in zip(node.ops, node.comparators):
+                if isinstance(op, (ast.In, ast.NotIn)):
+                    if not isinstance(comparator, (ast.List, ast.Tuple, ast.Set)):
+                        raise ValueError("'in' needs a literal list, e.g. ticker in ('AAPL', 'TSLA')")
+                    options = [self.evaluate(e, columns) for e in comparator.elts]
+                    result = np.isin(left, options)
+                    result = ~result if isinstance(op, ast.NotIn) else result
+                    right = None
+                elif type(op) in SCREEN_COMPARE_OPS:
+                    right = self.evaluate(comparator, columns)
+                    with np.errstate(invalid='ignore'):
+                        result = SCREEN_COMPARE_OPS[type(op)](left, right)
+                else:
+                    break
+                mask, left = mask & self.as_mask(result, columns), right
+            else:
+                return mask
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in SCREEN_FUNCTIONS and not node.keywords:
+            with np.errstate(all='ignore'):
+                return SCREEN_FUNCTIONS[node.func.id](*[self.evaluate(a, columns) for a in node.args])
+        raise ValueError(f"Unsupported expression: {ast.unparse(node)[:80]}")
+
+    def as_mask(self, value, columns):
+        """Boolean row mask from an evaluated expression; None and NaN count as False"""
+        size = len(columns['ticker']) if 'ticker' in columns else 0
+        value = np.asarray(value)
+        if value.dtype == object:
+            value = np.array([bool(v) and v == v for v in np.broadcast_to(value, (size,))], dtype=bool)
+        elif value.dtype.kind == 'f':
+            value = np.nan_to_num(value) != 0
+        return np.broadcast_to(value.astype(bool), (size,))
+
+    def screen(self, entry, where=None, sort=None, limit=50):
+        """
+        Rows matching `where`, ordered by the `sort` expression (ascending;
+        prefix a minus for descending, missing values last), at most `limit`
+        """
+        rows, columns = self.refresh(entry)
+        order = np.arange(len(rows))
+        if where:
+            order = order[self.as_mask(self.evaluate(self.parse(where), columns), columns)]
+        if sort and len(order):
+            keys = np.broadcast_to(np.asarray(self.evaluate(self.parse(sort), columns)), (len(rows),))[order]
+            if keys.dtype == object:
+                missing = np.array([k is None for k in keys])
+                keys = np.where(missing, '', keys).astype(str)
+            else:
+                missing = np.isnan(keys.astype(float))
+            order = order[np.lexsort((keys, missing))]
+        return [rows[i] for i in order[:limit]], len(order)
+
+    def stats(self):
+        with self._lock:
+            return {'rows': len(self.rows), 'fields': len(self.columns), 'computedAt': self.computed_at}
+
+universe_index = UniverseIndex()
+
+# ===== SCAN ENDPOINTS =====
+
+def squeeze_request(data):
+    """Scan key, scanner and result filter for a squeeze request's thresholds"""
+    min_short = float(data.get('minShort', 25))
+    min_gain = float(data.get('minGain', 15))
+    min_vol_ratio = float(data.get('minVolRatio', 1.5))
+    min_risk = float(data.get('minRisk', 60))
+    
+    if min_gain >= SQUEEZE_PREFILTER_MIN_GAIN and min_vol_ratio >= SQUEEZE_PREFILTER_MIN_VOL_RATIO:
+        key, func = 'squeeze', None
+    else:
+        key = ('squeeze', min_gain, min_vol_ratio)
+        func = lambda: run_squeeze_scan(min_gain, min_vol_ratio)
+    
+    def keep(r):
+        return (r['shortInterest'] >= min_short and
+                r['dailyChange'] >= min_gain and
+                r['volumeRatio'] >= min_vol_ratio and
+                r['riskScore'] >= min_risk)
+    
+    return key, func, keep
+
+def usuals_request(tickers):
+    """Scan key and scanner for a usuals watchlist"""
+    if tickers == DEFAULT_USUALS:
+        return 'usuals', None
+    # Custom watchlists share the usuals cadence but not the scheduled run
+    return ('usuals',) + tuple(tickers), lambda: run_usuals_scan(tickers)
+
+def continuity_request(tickers, timeframes):
+    """Scan key and scanner for a continuity watchlist and timeframe set"""
+    timeframes = tuple(timeframes)
+    unknown = [tf for tf in timeframes if tf not in TIMEFRAMES]
+    if unknown or not timeframes:
+        raise ValueError(f"Unknown timeframes: {', '.join(unknown) or 'none given'}")
+    if tickers == DEFAULT_USUALS and timeframes == CONTINUITY_TIMEFRAMES:
+        return 'continuity', None
+    return ('continuity', timeframes) + tuple(tickers), lambda: run_continuity_scan(tickers, timeframes)
+
+@app.route('/api/scan', methods=['POST'])
+def scan():
+    """API endpoint to scan for squeeze candidates"""
+    try:
+        key, func, keep = squeeze_request(request.json)
+        entry = get_scan_result('squeeze', key, func)
+        results = [r for r in entry['results'] if keep(r)]
         
-        return jsonify({
-            'success': True,
-            'results': results,
-            'timestamp': datetime.now().isoformat()
-        })
+        return scan_response(entry, results)
         
     except Exception as e:
         return jsonify({
@@ -552,65 +3716,8 @@ def scan():
 def daily_plays():
     """Daily plays scanner - KEEP FULL LIST (47 stocks)"""
     try:
-        popular_tickers = [
-            'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'AMD',
-            'SPY', 'QQQ', 'IWM', 'DIA',
-            'NFLX', 'DIS', 'BABA', 'PYPL', 'SQ', 'ROKU', 'SNAP', 'UBER',
-            'F', 'GM', 'NIO', 'LCID', 'RIVN',
-            'BA', 'GE', 'CAT', 'DE',
-            'JPM', 'BAC', 'GS', 'MS', 'C',
-            'XOM', 'CVX', 'COP', 'SLB',
-            'PFE', 'JNJ', 'MRNA', 'BNTX',
-            'WMT', 'TGT', 'COST', 'HD', 'LOW',
-        ]
-        
-        results = []
-        total = len(popular_tickers)
-        
-        print(f"\n🎯 Daily Plays scan - {total} stocks...")
-        
-        for i, ticker in enumerate(popular_tickers, 1):
-            try:
-                time.sleep(0.7)
-                
-                stock_data = yf.Ticker(ticker)
-                hist = stock_data.history(period='1mo')
-                info = stock_data.info
-                
-                if len(hist) >= 3:
-                    has_pattern, pattern_data = check_strat_31(hist)
-                    
-                    if has_pattern:
-                        current_price = hist['Close'].iloc[-1]
-                        previous_close = hist['Close'].iloc[-2]
-                        daily_change = ((current_price - previous_close) / previous_close) * 100
-                        
-                        results.append({
-                            'ticker': ticker,
-                            'company': info.get('longName', ticker),
-                            'currentPrice': float(current_price),
-                            'dailyChange': float(daily_change),
-                            'volume': int(hist['Volume'].iloc[-1]),
-                            'avgVolume': int(hist['Volume'].mean()),
-                            'marketCap': info.get('marketCap', 0),
-                            'pattern': pattern_data,
-                            'timeframe': 'daily'
-                        })
-                        
-                        print(f"✅ {ticker}: {pattern_data['direction']} ({i}/{total})")
-                
-            except Exception as e:
-                print(f"❌ {ticker}: {e}")
-                continue
-        
-        print(f"✅ Found {len(results)} daily patterns\n")
-        
-        return jsonify({
-            'success': True,
-            'results': results,
-            'timestamp': datetime.now().isoformat()
-        })
-        
+        entry = get_scan_result('daily')
+        return scan_response(entry, entry['results'])
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -618,48 +3725,8 @@ def daily_plays():
 def weekly_plays():
     """Weekly plays scanner - COMBINED DAILY + VOLEMON LIST"""
     try:
-        combined_tickers = get_combined_weekly_hourly_list()
-        results = []
-        
-        print(f"\n📅 Weekly Plays scan - {len(combined_tickers)} stocks...")
-        
-        for ticker in combined_tickers:
-            try:
-                time.sleep(0.7)
-                
-                stock_data = yf.Ticker(ticker)
-                hist = stock_data.history(period='3mo')
-                
-                if len(hist) >= 3:
-                    # Resample to weekly
-                    weekly = hist.resample('W').agg({
-                        'Open': 'first',
-                        'High': 'max',
-                        'Low': 'min',
-                        'Close': 'last',
-                        'Volume': 'sum'
-                    })
-                    
-                    has_pattern, pattern_data = check_strat_31(weekly)
-                    
-                    if has_pattern:
-                        current_price = hist['Close'].iloc[-1]
-                        results.append({
-                            'ticker': ticker,
-                            'company': ticker,
-                            'currentPrice': float(current_price),
-                            'volume': int(hist['Volume'].iloc[-1]),
-                            'pattern': pattern_data,
-                            'timeframe': 'weekly'
-                        })
-                        print(f"✅ {ticker}")
-            except:
-                continue
-        
-        print(f"✅ Found {len(results)} weekly patterns\n")
-        
-        return jsonify({'success': True, 'results': results})
-        
+        entry = get_scan_result('weekly')
+        return scan_response(entry, entry['results'])
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -667,39 +3734,8 @@ def weekly_plays():
 def hourly_plays():
     """Hourly plays scanner - COMBINED DAILY + VOLEMON LIST"""
     try:
-        combined_tickers = get_combined_weekly_hourly_list()
-        results = []
-        
-        print(f"\n⏰ Hourly Plays scan - {len(combined_tickers)} stocks...")
-        
-        for ticker in combined_tickers:
-            try:
-                time.sleep(0.7)
-                
-                stock_data = yf.Ticker(ticker)
-                hist = stock_data.history(period='5d', interval='1h')
-                
-                if len(hist) >= 3:
-                    has_pattern, pattern_data = check_strat_31(hist)
-                    
-                    if has_pattern:
-                        current_price = hist['Close'].iloc[-1]
-                        results.append({
-                            'ticker': ticker,
-                            'company': ticker,
-                            'currentPrice': float(current_price),
-                            'volume': int(hist['Volume'].iloc[-1]),
-                            'pattern': pattern_data,
-                            'timeframe': 'hourly'
-                        })
-                        print(f"✅ {ticker}")
-            except:
-                continue
-        
-        print(f"✅ Found {len(results)} hourly patterns\n")
-        
-        return jsonify({'success': True, 'results': results})
-        
+        entry = get_scan_result('hourly')
+        return scan_response(entry, entry['results'])
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -707,50 +3743,8 @@ def hourly_plays():
 def crypto_plays():
     """Crypto scanner - KEEP FULL LIST (5 cryptos)"""
     try:
-        crypto_tickers = {
-            'BTC-USD': 'Bitcoin',
-            'ETH-USD': 'Ethereum',
-            'XRP-USD': 'Ripple',
-            'SOL-USD': 'Solana',
-            'DOGE-USD': 'Dogecoin'
-        }
-        
-        results = []
-        
-        print(f"\n₿ Crypto scan - {len(crypto_tickers)} cryptos...")
-        
-        for ticker, name in crypto_tickers.items():
-            try:
-                time.sleep(0.7)
-                
-                stock_data = yf.Ticker(ticker)
-                hist = stock_data.history(period='1mo')
-                
-                if len(hist) >= 3:
-                    has_pattern, pattern_data = check_strat_31(hist)
-                    
-                    if has_pattern:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_price = hist['Close'].iloc[-2]
-                        change = ((current_price - prev_price) / prev_price) * 100
-                        
-                        results.append({
-                            'ticker': ticker.replace('-USD', ''),
-                            'company': name,
-                            'currentPrice': float(current_price),
-                            'change': float(change),
-                            'volume': int(hist['Volume'].iloc[-1]),
-                            'pattern': pattern_data,
-                            'timeframe': 'daily'
-                        })
-                        print(f"✅ {name}")
-            except:
-                continue
-        
-        print(f"✅ Found {len(results)} crypto patterns\n")
-        
-        return jsonify({'success': True, 'results': results})
-        
+        entry = get_scan_result('crypto')
+        return scan_response(entry, entry['results'])
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -761,59 +3755,12 @@ def volemon_scan():
         data = request.json or {}
         min_volume_multiple = float(data.get('min_volume_multiple', 2.0))
         
-        popular_tickers = [
-            'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'AMD',
-            'SPY', 'QQQ', 'IWM', 'DIA',
-            'NFLX', 'DIS', 'BABA', 'PYPL', 'SQ', 'ROKU', 'SNAP', 'UBER',
-            'F', 'GM', 'NIO', 'LCID', 'RIVN',
-            'JPM', 'BAC', 'GS', 'MS', 'C',
-            'XOM', 'CVX', 'COP', 'SLB',
-        ]
-        
-        results = []
-        
-        print(f"\n🔊 Volemon scan - {len(popular_tickers)} stocks...")
-        
-        for ticker in popular_tickers:
-            try:
-                time.sleep(0.7)
-                
-                stock_data = yf.Ticker(ticker)
-                hist = stock_data.history(period='5d')
-                info = stock_data.info
-                
-                if len(hist) >= 2:
-                    current_volume = hist['Volume'].iloc[-1]
-                    avg_volume = hist['Volume'].iloc[:-1].mean()
-                    
-                    if avg_volume > 0:
-                        volume_multiple = current_volume / avg_volume
-                        
-                        if volume_multiple >= min_volume_multiple:
-                            current_price = hist['Close'].iloc[-1]
-                            prev_price = hist['Close'].iloc[-2]
-                            change = ((current_price - prev_price) / prev_price) * 100
-                            
-                            results.append({
-                                'ticker': ticker,
-                                'company': info.get('longName', ticker),
-                                'price': float(current_price),
-                                'change': float(change),
-                                'volume': int(current_volume),
-                                'avg_volume': int(avg_volume),
-                                'volume_multiple': float(volume_multiple),
-                                'market_cap': info.get('marketCap', 0)
-                            })
-                            
-                            print(f"✅ {ticker}: {volume_multiple:.1f}x")
-            except:
-                continue
-        
-        results.sort(key=lambda x: x['volume_multiple'], reverse=True)
+        entry = get_scan_result('volemon')
         
-        print(f"✅ Found {len(results)}\n")
+        def select(results):
+            return [r for r in results if r['volume_multiple'] >= min_volume_multiple][:50]
         
-        return jsonify({'success': True, 'results': results[:50]})
+        return delta_response(entry, select, data.get('since'))
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -823,70 +3770,243 @@ def usuals_scan():
     """Usuals watchlist scanner - KEEP FULL LIST (14 stocks default)"""
     try:
         data = request.json or {}
-        tickers = data.get('tickers', ['SOFI', 'INTC', 'SPY', 'TSLA', 'COIN', 'CDE', 'PLTR', 'AAPL', 'BAC', 'NVDA', 'GOOGL', 'META', 'MSFT', 'UNH'])
+        key, func = usuals_request(data.get('tickers', DEFAULT_USUALS))
+        entry = get_scan_result('usuals', key, func)
         
-        results = []
+        return delta_response(entry, lambda results: results, data.get('since'))
         
-        print(f"\n⭐ Usuals scan - {len(tickers)} stocks...")
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/continuity-scan', methods=['POST'])
+def continuity_scan():
+    """Strat bars on every timeframe for a watchlist, with full-timeframe continuity"""
+    try:
+        data = request.json or {}
+        try:
+            key, func = continuity_request(data.get('tickers', DEFAULT_USUALS),
+                                           data.get('timeframes', CONTINUITY_TIMEFRAMES))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        entry = get_scan_result('continuity', key, func)
+        
+        results = entry['results']
+        if data.get('continuity_only'):
+            results = [r for r in results if r['continuity']]
+        return scan_response(entry, results)
         
-        for ticker in tickers:
-            try:
-                stock_data, hist, info = safe_yf_ticker(ticker)
-                
-                if stock_data and hist is not None and len(hist) >= 3:
-                    current_price = hist['Close'].iloc[-1]
-                    prev_price = hist['Close'].iloc[-2]
-                    change = ((current_price - prev_price) / prev_price) * 100
-                    
-                    current_volume = hist['Volume'].iloc[-1]
-                    avg_volume = hist['Volume'].iloc[:-1].mean()
-                    volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
-                    
-                    # Check patterns
-                    patterns = {}
-                    has_pattern, pattern_data = check_strat_31(hist)
-                    
-                    if has_pattern:
-                        patterns['daily'] = {
-                            'type': '3-1 Strat',
-                            'direction': pattern_data['direction']
-                        }
-                    else:
-                        # Check inside bar
-                        current = hist.iloc[-1]
-                        previous = hist.iloc[-2]
-                        is_inside = (current['High'] < previous['High'] and 
-                                   current['Low'] > previous['Low'])
-                        if is_inside:
-                            patterns['daily'] = {
-                                'type': 'Inside Bar (1)',
-                                'direction': 'neutral'
-                            }
-                    
-                    results.append({
-                        'ticker': ticker,
-                        'company': info.get('longName', ticker),
-                        'price': float(current_price),
-                        'change': float(change),
-                        'volume': int(current_volume),
-                        'avg_volume': int(avg_volume),
-                        'volume_ratio': float(volume_ratio),
-                        'patterns': patterns
-                    })
-                    
-                    print(f"✅ {ticker}")
-                    
-            except Exception as e:
-                print(f"⚠️  {ticker}: {e}")
-                continue
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/screen', methods=['POST'])
+def screen():
+    """Filter and sort the universe snapshot with expressions over its fields"""
+    try:
+        data = request.json or {}
+        entry = get_scan_result('universe')
+        started = time.perf_counter()
+        try:
+            limit = max(0, min(int(data.get('limit', 50)), SCREEN_MAX_RESULTS))
+            results, matched = universe_index.screen(entry, data.get('where'), data.get('sort'), limit)
+        except (ValueError, TypeError, OverflowError) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        fields = data.get('fields')
+        if fields:
+            results = [{f: r.get(f) for f in ['ticker'] + [f for f in fields if f != 'ticker']} for r in results]
+        return scan_response(entry, results, matched=matched,
+                             fields=list(universe_index.columns),
+                             queryMicros=round((time.perf_counter() - started) * 1e6))
         
-        print(f"✅ Done! {len(results)} stocks\n")
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/win-rates', methods=['GET'])
+def win_rates():
+    """3-1 win rates per ticker and timeframe from the latest backtest"""
+    try:
+        tickers = [t.strip().upper() for t in request.args.get('tickers', '').split(',') if t.strip()] or None
+        timeframes = [t.strip() for t in request.args.get('timeframes', '').split(',') if t.strip()] or None
+        unknown = [tf for tf in timeframes or [] if tf not in BACKTEST_TIMEFRAMES]
+        if unknown:
+            return jsonify({'success': False, 'error': f"Unknown timeframes: {', '.join(unknown)}"}), 400
         
-        return jsonify({'success': True, 'results': results})
+        entry = get_scan_result('backtest')
+        return scan_response(entry, None,
+                             winRates=win_rate_table.lookup(entry, tickers, timeframes),
+                             rule={'holdDays': BACKTEST_HOLD_DAYS, 'winPercent': BACKTEST_WIN_PERCENT})
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Streaming variants (GET, for EventSource): `progress` events carry
+# {done, total}, `match` events one {result}, and `done` ends the stream.
+# Matches arrive in scan order; the POST endpoints return them sorted.
+
+@app.route('/api/scan/stream', methods=['GET'])
+def scan_stream():
+    """Squeeze candidates as they are scored; thresholds come from the query string"""
+    try:
+        key, func, keep = squeeze_request(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return stream_scan('squeeze', key, func, keep)
+
+@app.route('/api/daily-plays/stream', methods=['GET'])
+def daily_plays_stream():
+    return stream_scan('daily')
+
+@app.route('/api/weekly-plays/stream', methods=['GET'])
+def weekly_plays_stream():
+    return stream_scan('weekly')
+
+@app.route('/api/hourly-plays/stream', methods=['GET'])
+def hourly_plays_stream():
+    return stream_scan('hourly')
+
+@app.route('/api/crypto-plays/stream', methods=['GET'])
+def crypto_plays_stream():
+    return stream_scan('crypto')
+
+@app.route('/api/volemon-scan/stream', methods=['GET'])
+def volemon_scan_stream():
+    """Volume multiples as they are measured, at or above ?min_volume_multiple="""
+    try:
+        min_volume_multiple = float(request.args.get('min_volume_multiple', 2.0))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return stream_scan('volemon', keep=lambda r: r['volume_multiple'] >= min_volume_multiple)
+
+@app.route('/api/usuals-scan/stream', methods=['GET'])
+def usuals_scan_stream():
+    """Usuals as they are classified; ?tickers=A,B,C for a custom watchlist"""
+    tickers = request.args.get('tickers')
+    tickers = [t.strip().upper() for t in tickers.split(',') if t.strip()] if tickers else DEFAULT_USUALS
+    key, func = usuals_request(tickers)
+    return stream_scan('usuals', key, func)
+
+@app.route('/api/continuity-scan/stream', methods=['GET'])
+def continuity_scan_stream():
+    """Continuity per ticker as it is classified; ?tickers=A,B,C&timeframes=daily,weekly"""
+    tickers = request.args.get('tickers')
+    tickers = [t.strip().upper() for t in tickers.split(',') if t.strip()] if tickers else DEFAULT_USUALS
+    timeframes = request.args.get('timeframes')
+    timeframes = [t.strip() for t in timeframes.split(',') if t.strip()] if timeframes else CONTINUITY_TIMEFRAMES
+    try:
+        key, func = continuity_request(tickers, timeframes)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    keep = (lambda r: r['continuity'] is not None) if request.args.get('continuity_only') == '1' else None
+    return stream_scan('continuity', key, func, keep)
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Bar cache hit/miss counters"""
+    return jsonify({
+        'success': True,
+        'bars': bar_cache.stats(),
+        'fundamentals': fundamentals.stats(),
+        'incremental': {'volemon': volemon_state.stats(), 'usuals': usuals_state.stats()},
+        'universe': universe_index.stats(),
+        'winRates': win_rate_table.stats(),
+        'users': user_store.stats(),
+        'shared': shared_cache.stats() if shared_cache is not None else None
+    })
+
+@app.route('/api/scheduler', methods=['GET'])
+def scheduler_status():
+    """Age of every stored scan result and when each job runs next"""
+    with scan_results_lock:
+        ages = {
+            str(key): round(time.time() - entry['computed_at'], 1)
+            for key, entry in scan_results.items()
+        }
+    next_runs = {}
+    if scan_scheduler is not None:
+        next_runs = {name: when.isoformat() for name, when in scan_scheduler.next_runs.items()}
+    return jsonify({
+        'success': True,
+        'enabled': SCHEDULER_ENABLED,
+        'running': scan_scheduler is not None,
+        'leader': scan_scheduler is not None and scan_scheduler.leader,
+        'ageSeconds': ages,
+        'nextRuns': next_runs
+    })
+
+@app.route('/api/providers', methods=['GET'])
+def provider_stats():
+    """Market data provider health and latency"""
+    return jsonify({
+        'success': True,
+        'mode': DATA_PROVIDER,
+        'providers': market_data.stats(),
+        'rateLimits': {name: bucket.stats() for name, bucket in rate_limits.items()},
+        'tradierBudget': tradier_calls.stats(),
+        'tradierQuotes': tradier_quotes.stats()
+    })
+
+# ===== METRICS ENDPOINT =====
+
+@metrics.collector
+def cache_metrics():
+    """Hit ratios and sizes of the in-process caches"""
+    samples = []
+    bars, derived = bar_cache.stats(), derived_bars.stats()
+    for cache, stats in (('bars', bars), ('derived_bars', derived)):
+        lookups = stats['hits'] + stats['misses']
+        samples += [
+            ('lemon_cache_hits_total', {'cache': cache}, stats['hits']),
+            ('lemon_cache_misses_total', {'cache': cache}, stats['misses']),
+            ('lemon_cache_hit_ratio', {'cache': cache}, stats['hits'] / lookups if lookups else 0.0),
+            ('lemon_cache_entries', {'cache': cache}, stats['entries'])
+        ]
+    # An incremental scan "hits" when a ticker's last bar is unchanged and its result is reused
+    for name, state in (('volemon', volemon_state), ('usuals', usuals_state)):
+        stats = state.stats()
+        cache = f'incremental_{name}'
+        lookups = stats['reused'] + stats['recomputed']
+        samples += [
+            ('lemon_cache_hits_total', {'cache': cache}, stats['reused']),
+            ('lemon_cache_misses_total', {'cache': cache}, stats['recomputed']),
+            ('lemon_cache_hit_ratio', {'cache': cache}, stats['reused'] / lookups if lookups else 0.0),
+            ('lemon_cache_entries', {'cache': cache}, stats['tickers'])
+        ]
+    users = user_store.stats()
+    lookups = users['hits'] + users['misses']
+    samples += [
+        ('lemon_cache_hits_total', {'cache': 'users'}, users['hits']),
+        ('lemon_cache_misses_total', {'cache': 'users'}, users['misses']),
+        ('lemon_cache_hit_ratio', {'cache': 'users'}, users['hits'] / lookups if lookups else 0.0),
+        ('lemon_cache_entries', {'cache': 'users'}, users['cached'])
+    ]
+    samples.append(('lemon_cache_entries', {'cache': 'fundamentals'}, fundamentals.stats()['entries']))
+    samples.append(('lemon_cache_entries', {'cache': 'tradier_quotes'}, tradier_quotes.stats()['cached']))
+    return samples
+
+@metrics.collector
+def rate_limit_metrics():
+    """Current provider rates and the Tradier minute budget"""
+    samples = [('lemon_rate_limit_rate', {'provider': name}, bucket.stats()['rate']) for name, bucket in rate_limits.items()]
+    samples.append(('lemon_tradier_budget_used', {}, tradier_calls.stats()['used']))
+    return samples
+
+@app.before_request
+def start_request_timing():
+    """?timing=1 collects this request's stage breakdown for scan_response"""
+    g.timings = None
+    if request.args.get('timing') == '1':
+        g.request_started = time.perf_counter()
+        g.timings = stage_timings.breakdown = {}
+
+@app.teardown_request
+def stop_request_timing(exc=None):
+    stage_timings.breakdown = None
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Counters, latency histograms and cache gauges in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
     
@@ -894,7 +4014,7 @@ if __name__ == '__main__':
     print("🍋 LEMON SQUEEZE WEB APP v3.0 - OPTIMIZED 🍋")
     print("="*60)
     print("\n📊 Stock Counts:")
-    print("  - Short Squeeze: Top 30 (highest short interest)")
+    print("  - Short Squeeze: Full CSV (two-stage prefilter)")
     print("  - Daily Plays: 47 stocks")
     print("  - Weekly/Hourly: 47 stocks (combined list)")
     print("  - Volemon: 33 stocks")
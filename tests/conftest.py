@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# The app reads its configuration at import: keep the bar store and the
+# user database in a throwaway directory
+scratch = tempfile.mkdtemp(prefix='lemon-tests-')
+os.environ.update({
+    'BAR_STORE_DIR': scratch,
+    'USERS_DB_PATH': os.path.join(scratch, 'users.db'),
+})
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import lemon_squeeze_webapp as webapp
+
+WATCHLIST = ['AAPL', 'AMD', 'AMZN', 'GOOGL', 'META', 'MSFT', 'NVDA', 'TSLA']
+
+
+def daily_bars(ticker, start=None):
+    """A year and a half of deterministic daily bars ending today, from `start` when given"""
+    index = pd.bdate_range(end=pd.Timestamp.now(tz=webapp.MARKET_TZ).normalize(), periods=400)
+    close = 100 + (sum(map(ord, ticker)) % 50) + np.arange(len(index)) * 0.1
+    frame = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                          'Volume': np.full(len(index), 1e6)}, index=index)
+    return frame if start is None else frame[frame.index >= pd.Timestamp(start, tz=webapp.MARKET_TZ)]
+
+
+class CountingProvider(webapp.DataProvider):
+    """Serves every ticker except `missing` and records each history() call"""
+
+    def __init__(self, name, missing=()):
+        self.name = name
+        self.missing = set(missing)
+        self.calls = []
+
+    def history(self, tickers, interval='1d', period='1mo', start=None):
+        self.calls.append({'tickers': list(tickers), 'start': start})
+        return {t: daily_bars(t, start) for t in tickers if t not in self.missing}
+
+    def info(self, tickers):
+        return {}
+
+
+@pytest.fixture
+def providers(monkeypatch, tmp_path):
+    primary = CountingProvider('primary', missing={'MISSING'})
+    fallback = CountingProvider('fallback')
+    monkeypatch.setattr(webapp, 'market_data', webapp.ProviderRouter([primary, fallback]))
+    monkeypatch.setattr(webapp, 'bar_cache', webapp.BarCache(webapp.BAR_CACHE_MAX_BYTES))
+    monkeypatch.setattr(webapp, 'bar_store', webapp.BarStore(str(tmp_path)))
+    monkeypatch.setattr(webapp, 'BAR_STORE_ENABLED', True)
+    return primary, fallback
+
+
+def test_watchlist_is_one_provider_call(providers):
+    primary, fallback = providers
+    tickers = WATCHLIST
+
+    frames = webapp.fetch_history_batch(tickers, '1y')
+
+    assert set(frames) == set(tickers)
+    assert [call['tickers'] for call in primary.calls] == [tickers]
+    assert fallback.calls == []
+
+
+def test_cached_watchlist_costs_no_calls(providers):
+    primary, _ = providers
+    webapp.fetch_history_batch(WATCHLIST, '1y')
+    webapp.fetch_history_batch(WATCHLIST, '1y')
+
+    assert len(primary.calls) == 1
+
+
+def test_only_missing_tickers_fall_back(providers):
+    primary, fallback = providers
+
+    frames = webapp.fetch_history_batch(['AAPL', 'MISSING', 'MSFT'], '1y')
+
+    assert set(frames) == {'AAPL', 'MISSING', 'MSFT'}
+    assert len(primary.calls) == 1
+    assert [call['tickers'] for call in fallback.calls] == [['MISSING']]
+
+
+def test_stored_bars_only_fetch_the_tail(providers, monkeypatch):
+    primary = CountingProvider('primary')
+    monkeypatch.setattr(webapp, 'market_data', webapp.ProviderRouter([primary]))
+    tickers = ['AAPL', 'MSFT', 'NVDA']
+    first = webapp.fetch_history_batch(tickers, '1y')
+
+    # A restart: the in-memory cache is gone but the bar store is not
+    monkeypatch.setattr(webapp, 'bar_cache', webapp.BarCache(webapp.BAR_CACHE_MAX_BYTES))
+    second = webapp.fetch_history_batch(tickers, '1y')
+
+    assert len(primary.calls) == 2
+    assert primary.calls[0]['start'] is None
+    assert primary.calls[1]['start'] is not None and primary.calls[1]['tickers'] == tickers
+    for ticker in tickers:
+        pd.testing.assert_frame_equal(first[ticker], second[ticker], check_freq=False)
+
+
+def test_failed_tail_serves_stored_bars(providers, monkeypatch):
+    primary = CountingProvider('primary')
+    monkeypatch.setattr(webapp, 'market_data', webapp.ProviderRouter([primary]))
+    tickers = ['AAPL', 'MSFT']
+    first = webapp.fetch_history_batch(tickers, '1y')
+
+    # A restart during an upstream outage: every tail request comes back empty
+    monkeypatch.setattr(webapp, 'bar_cache', webapp.BarCache(webapp.BAR_CACHE_MAX_BYTES))
+    primary.missing = set(tickers)
+    second = webapp.fetch_history_batch(tickers, '1y')
+
+    assert set(second) == set(tickers)
+    for ticker in tickers:
+        pd.testing.assert_frame_equal(first[ticker], second[ticker], check_freq=False)
+
+    # The stored bars weren't cached, so the next scan asks for the tail again
+    webapp.fetch_history_batch(tickers, '1y')
+    assert len(primary.calls) == 3
+    assert primary.calls[2]['start'] is not None
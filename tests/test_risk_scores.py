@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import lemon_squeeze_webapp as webapp
+
+
+def scalar_scores(short_interest, daily_change, volume_ratio, days_to_cover, float_shares):
+    return np.array([
+        webapp.calculate_risk_score(*args)
+        for args in zip(short_interest, daily_change, volume_ratio, days_to_cover, float_shares)
+    ])
+
+
+def test_matches_scalar_score_on_random_inputs():
+    rng = np.random.default_rng(42)
+    n = 5000
+    inputs = (
+        rng.uniform(0, 80, n),        # short interest %
+        rng.uniform(-30, 80, n),      # daily change %
+        rng.uniform(0, 10, n),        # volume ratio
+        rng.uniform(0, 40, n),        # days to cover
+        rng.uniform(0, 2e9, n),       # float shares
+    )
+    np.testing.assert_array_equal(webapp.calculate_risk_scores(*inputs), scalar_scores(*inputs))
+
+
+@pytest.mark.parametrize('days_to_cover', [0, 0.5, 0.999, 1, 5, 10, 10.001, 15, 30, 50])
+def test_days_to_cover_boundaries(days_to_cover):
+    args = ([40.0], [20.0], [2.0], [days_to_cover], [3e7])
+    assert webapp.calculate_risk_scores(*args)[0] == scalar_scores(*args)[0]
+
+
+@pytest.mark.parametrize('float_shares', [0, -1, 1, 49_999_999, 50e6, 99_999_999, 100e6, 199_999_999, 200e6,
+                                          499_999_999, 500e6, 5e9])
+def test_float_size_boundaries(float_shares):
+    args = ([40.0], [20.0], [2.0], [5.0], [float_shares])
+    assert webapp.calculate_risk_scores(*args)[0] == scalar_scores(*args)[0]
@@ -0,0 +1,78 @@
+import math
+import os
+import sys
+import threading
+
+import pytest
+
+import lemon_squeeze_webapp as webapp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+from fake_market import FakeMarketServer
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = FakeMarketServer(latency=0).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def tradier(server, monkeypatch):
+    """Point the Tradier client at the stub server with a fresh quote cache and call budget"""
+    server.reset_counts()
+    monkeypatch.setattr(webapp, 'TRADIER_API_KEY', 'test')
+    monkeypatch.setattr(webapp, 'TRADIER_BASE_URL', server.base_url)
+    monkeypatch.setattr(webapp, 'tradier_quotes', webapp.TradierQuotes())
+    monkeypatch.setattr(webapp, 'tradier_calls', webapp.CallWindow(webapp.TRADIER_CALLS_PER_MINUTE))
+    monkeypatch.setitem(webapp.rate_limits, 'tradier', webapp.TokenBucket('tradier', 1000.0))
+    return server
+
+
+def run_threads(count, target):
+    """Start `count` threads at the same moment and wait for all of them"""
+    barrier = threading.Barrier(count)
+
+    def run(i):
+        barrier.wait()
+        target(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.mark.parametrize('count', [1, 99, 100, 101, 250])
+def test_fallbacks_cost_one_request_per_chunk(tradier, count):
+    tickers = [f'T{i:04d}' for i in range(count)]
+
+    info = webapp.TradierProvider().info(tickers)
+
+    assert set(info) == set(tickers)
+    assert tradier.counts()['calls'] == {'/markets/quotes': math.ceil(count / webapp.TRADIER_SYMBOLS_PER_CALL)}
+
+
+def test_cached_quotes_cost_no_requests(tradier):
+    tickers = [f'T{i:04d}' for i in range(150)]
+    webapp.TradierProvider().info(tickers)
+    tradier.reset_counts()
+
+    webapp.TradierProvider().info(tickers)
+
+    assert tradier.total_calls() == 0
+
+
+def test_call_window_caps_concurrent_callers(tradier):
+    limit = webapp.TRADIER_CALLS_PER_MINUTE
+    tickers = [f'T{i:04d}' for i in range(limit + 80)]
+    served = []
+
+    # Distinct tickers through get_many, so nothing is coalesced and every thread wants its own call
+    run_threads(len(tickers), lambda i: served.extend(webapp.tradier_quotes.get_many([tickers[i]])))
+
+    assert len(served) == limit
+    assert tradier.total_calls() == limit
+    assert webapp.tradier_calls.stats()['refused'] == len(tickers) - limit
@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+import lemon_squeeze_webapp as webapp
+
+
+def favorite(ticker, timeframe='daily'):
+    return {'ticker': ticker, 'timeframe': timeframe, 'company': f'{ticker} Inc', 'added_at': '2026-01-02T09:30:00'}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return webapp.UserStore(str(tmp_path / 'users.db'))
+
+
+def test_duplicate_favorite_is_ignored(store):
+    assert store.add_favorite('a@x.com', favorite('AAPL'))
+    assert not store.add_favorite('a@x.com', favorite('AAPL'))
+    # The same ticker on another timeframe, or for another user, is a different favorite
+    assert store.add_favorite('a@x.com', favorite('AAPL', 'weekly'))
+    assert store.add_favorite('b@x.com', favorite('AAPL'))
+
+    assert [(f['ticker'], f['timeframe']) for f in store.favorites('a@x.com')] == [('AAPL', 'daily'), ('AAPL', 'weekly')]
+
+
+def test_duplicate_user_is_ignored(store):
+    assert store.add_user('A', 'a@x.com', 'hash')
+    assert not store.add_user('Other', 'a@x.com', 'other')
+    assert store.get_user('a@x.com')['name'] == 'A'
+
+
+def test_remove_favorite(store):
+    store.add_favorite('a@x.com', favorite('AAPL'))
+    store.add_favorite('a@x.com', favorite('TSLA'))
+    assert len(store.favorites('a@x.com')) == 2
+
+    store.remove_favorite('a@x.com', 'AAPL', 'daily')
+    store.remove_favorite('a@x.com', 'NVDA', 'daily')  # Not a favorite: nothing happens
+
+    assert [f['ticker'] for f in store.favorites('a@x.com')] == ['TSLA']
+
+
+def test_cache_is_dropped_after_another_connection_writes(store):
+    store.add_user('A', 'a@x.com', 'hash')
+    assert store.favorites('a@x.com') == []
+    assert store.favorites('a@x.com') == []
+    assert store.hits == 1
+
+    # Another worker process, as far as SQLite can tell
+    other = sqlite3.connect(store.path, isolation_level=None)
+    other.execute(
+        'INSERT INTO favorites (email, ticker, timeframe, company, added_at) VALUES (?, ?, ?, ?, ?)',
+        ('a@x.com', 'NVDA', 'daily', 'NVIDIA', '2026-01-02T09:30:00')
+    )
+    other.execute("UPDATE users SET name = 'Renamed' WHERE email = 'a@x.com'")
+    other.close()
+
+    assert [f['ticker'] for f in store.favorites('a@x.com')] == ['NVDA']
+    assert store.get_user('a@x.com')['name'] == 'Renamed'
+
+
+def test_unknown_emails_are_not_cached(store):
+    assert store.get_user('nobody@x.com') is None
+    assert store.stats()['cached'] == 0
+
+    store.add_user('N', 'nobody@x.com', 'hash')
+    assert store.get_user('nobody@x.com')['name'] == 'N'